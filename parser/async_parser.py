@@ -0,0 +1,201 @@
+import asyncio
+import base64
+import socket
+from typing import Dict, Iterable, List, Union
+
+import aiohttp
+import pandas as pd
+from selenium.common.exceptions import WebDriverException
+
+from blocks_parser import Parser
+from metrics import ParserMetrics
+from page_scripts import COLLECT_TEXT_SCRIPT, EXTRACT_ELEMENTS_SCRIPT, LAYOUT_STABLE_SCRIPT, PAGE_SIZE_SCRIPT
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AsyncSession:
+    # minimal W3C WebDriver client, geckodriver serves a single session per process
+    def __init__(self, http: aiohttp.ClientSession, geckodriver_path: str, on_command=None):
+        self.http = http
+        self.geckodriver_path = geckodriver_path
+        self.on_command = on_command
+        self.process: asyncio.subprocess.Process = None
+        self.url: str = None
+        self.session_id: str = None
+
+    async def start(self, capabilities: dict, startup_timeout: float = 30) -> None:
+        port = free_port()
+        self.process = await asyncio.create_subprocess_exec(
+            self.geckodriver_path, "--port", str(port),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        self.url = f"http://127.0.0.1:{port}"
+
+        deadline = asyncio.get_running_loop().time() + startup_timeout
+        while True:
+            try:
+                async with self.http.get(f"{self.url}/status") as response:
+                    if (await response.json())["value"]["ready"]:
+                        break
+            except aiohttp.ClientError:
+                pass
+            if asyncio.get_running_loop().time() > deadline:
+                raise WebDriverException("geckodriver did not start")
+            await asyncio.sleep(0.1)
+
+        value = await self.request("POST", "/session", {"capabilities": {"alwaysMatch": capabilities}})
+        self.session_id = value["sessionId"]
+
+    async def request(self, method: str, path: str, payload: dict = None):
+        async with self.http.request(method, self.url + path, json=payload) as response:
+            data = await response.json()
+        value = data.get("value")
+        if response.status >= 400 or (isinstance(value, dict) and "error" in value):
+            raise WebDriverException(value.get("message") if isinstance(value, dict) else str(value))
+        return value
+
+    async def command(self, method: str, path: str, payload: dict = None):
+        if self.on_command:
+            self.on_command(f"{method} {path or '/'}")
+        return await self.request(method, f"/session/{self.session_id}{path}", payload)
+
+    async def get(self, url: str) -> None:
+        await self.command("POST", "/url", {"url": url})
+
+    async def execute(self, script: str, *args):
+        return await self.command("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def execute_async(self, script: str, *args):
+        return await self.command("POST", "/execute/async", {"script": script, "args": list(args)})
+
+    async def set_window_size(self, width: int, height: int) -> None:
+        await self.command("POST", "/window/rect", {"width": width, "height": height})
+
+    async def full_page_screenshot(self) -> bytes:
+        return base64.b64decode(await self.command("GET", "/moz/screenshot/full"))
+
+    async def quit(self) -> None:
+        try:
+            if self.session_id:
+                await self.command("DELETE", "")
+        finally:
+            self.session_id = None
+            if self.process and self.process.returncode is None:
+                self.process.terminate()
+                await self.process.wait()
+
+
+class AsyncParser(Parser):
+    def __init__(self, *args, http: aiohttp.ClientSession = None, **kwargs):
+        self.http = http
+        self.owns_http = http is None
+        self.page_screenshot: bytes = None
+        super().__init__(*args, **kwargs)
+
+    def create_driver(self, firefox_path: str) -> None:
+        self.firefox_path = firefox_path
+        self.session: AsyncSession = None
+        return None
+
+    async def start(self) -> None:
+        if self.http is None:
+            self.http = aiohttp.ClientSession()
+        self.session = AsyncSession(self.http, self.get_geckodriver_path(),
+                                    on_command=lambda command: self.metrics.count_command(command))
+        options = self.get_options(firefox_path=self.firefox_path)
+        # request blocking needs a BiDi connection which this client does not open
+        options.enable_bidi = False
+        await self.session.start(options.to_capabilities())
+        if self.load_profile.viewport:
+            await self.session.set_window_size(*self.load_profile.viewport)
+
+    async def aclose(self) -> None:
+        self.screenshots.close()
+        if self.session:
+            await self.session.quit()
+        if self.owns_http and self.http is not None:
+            await self.http.close()
+            self.http = None
+
+    def close(self) -> None:
+        self.screenshots.close()
+
+    async def load_page_async(self, url: str) -> None:
+        with self.metrics.stage("load_page"):
+            await self.session.get(url)
+            if self.load_profile.wait_for_layout_stable:
+                await self.session.execute_async(LAYOUT_STABLE_SCRIPT, {
+                    "checks": self.load_profile.stable_checks,
+                    "interval": int(self.load_profile.stable_interval * 1000),
+                    "timeout": int(self.load_profile.layout_timeout * 1000),
+                })
+
+    async def parse(self, url: str) -> pd.DataFrame:
+        if self.session is None:
+            await self.start()
+        self.metrics = ParserMetrics(url)
+        with self.metrics.stage("parse"):
+            await self.load_page_async(url)
+
+            with self.metrics.stage("page_size"):
+                self.page_width, self.page_height = await self.session.execute(PAGE_SIZE_SCRIPT)
+            self.min_block_width = self.min_block_width_ratio * self.page_width
+
+            if self.debug:
+                print(self.page_width, self.page_height)
+
+            # geckodriver queues the commands, the round trips and json decoding overlap
+            with self.metrics.stage("collect_page_data"):
+                extracted, text_data, self.page_screenshot = await asyncio.gather(
+                    self.session.execute(EXTRACT_ELEMENTS_SCRIPT, {
+                        "maps_regex": self.maps_regex.pattern,
+                        "min_block_height": self.min_block_height,
+                        "min_block_width": self.min_block_width,
+                    }),
+                    self.session.execute(COLLECT_TEXT_SCRIPT),
+                    self.session.full_page_screenshot() if self.debug else asyncio.sleep(0),
+                )
+            with self.metrics.stage("collect_elements_data"):
+                elements_data = self.build_elements_data(self.extracted_columns(extracted))
+
+            # segmentation and block features are cpu work, keep the loop free for other sessions
+            return await asyncio.to_thread(self.analyze_collected, url, elements_data, text_data)
+
+    def get_full_page_screenshot(self) -> bytes:
+        return self.page_screenshot
+
+
+async def parse_many(urls: Iterable[str], sessions: int = 8, connections: int = 100,
+                     **parser_kwargs) -> Dict[str, Union[pd.DataFrame, Exception]]:
+    queue = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+    results = {}
+
+    async def worker(parser: AsyncParser) -> None:
+        try:
+            await parser.start()
+        except Exception:
+            await parser.aclose()
+            return
+        try:
+            while not queue.empty():
+                url = queue.get_nowait()
+                try:
+                    results[url] = await parser.parse(url)
+                except Exception as error:
+                    results[url] = error
+        finally:
+            await parser.aclose()
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connections)) as http:
+        parsers: List[AsyncParser] = [AsyncParser(http=http, **parser_kwargs)
+                                      for _ in range(min(sessions, queue.qsize()))]
+        await asyncio.gather(*(worker(parser) for parser in parsers))
+    while not queue.empty():
+        results[queue.get_nowait()] = WebDriverException("no browser session could be started")
+    return results
@@ -0,0 +1,110 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+from typing import Dict, Iterable, List, Tuple
+
+from blocks_parser import Parser
+from load_profile import LoadProfile
+from metrics import JsonLinesSink
+from output_store import ResultStore
+from result_cache import ResultCache
+from supervisor import ParseFailed, ParserSupervisor
+
+
+class ParserWorker:
+    def __init__(self, firefox_path: str, debug: bool = False, pages_per_driver: int = 50, url_timeout: float = 120,
+                 cache_dir: str = None, load_profile: LoadProfile = None, viewports: List[Tuple[int, int]] = None,
+                 parse_timeout: float = None, stage_timeouts: Dict[str, float] = None, retries: int = 2):
+        self.firefox_path = firefox_path
+        self.load_profile = load_profile
+        self.viewports = viewports
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        self.debug = debug
+        self.url_timeout = url_timeout
+        self.supervisor = ParserSupervisor(self.create_parser, parse_timeout=parse_timeout or 2 * url_timeout,
+                                           stage_timeouts=stage_timeouts, retries=retries,
+                                           pages_per_parser=pages_per_driver)
+        self.last_metrics: dict = None
+        self.last_failures: List[dict] = []
+
+    def create_parser(self) -> Parser:
+        parser = Parser(firefox_path=self.firefox_path, debug=self.debug, cache=self.cache,
+                        load_profile=self.load_profile)
+        parser.driver.set_page_load_timeout(self.url_timeout)
+        parser.driver.set_script_timeout(self.url_timeout)
+        return parser
+
+    def close(self) -> None:
+        self.supervisor.close()
+
+    def parse(self, url: str, store: ResultStore) -> str:
+        self.last_failures = []
+        try:
+            df = self.supervisor.parse(url, screenshot_path=store.screenshot_dir(url) if self.debug else None,
+                                       viewports=self.viewports)
+        except ParseFailed as error:
+            self.last_failures = error.failures
+            raise
+        finally:
+            self.last_metrics = self.supervisor.last_metrics
+
+        return store.write_site(url, df)
+
+
+_worker: ParserWorker = None
+_store: ResultStore = None
+
+
+def _init_worker(firefox_path: str, debug: bool, pages_per_driver: int, url_timeout: float, cache_dir: str,
+                 load_profile: LoadProfile, output_dir: str, output_format: str, archive: bool,
+                 viewports: List[Tuple[int, int]], parse_timeout: float, stage_timeouts: Dict[str, float],
+                 retries: int) -> None:
+    global _worker, _store
+    _worker = ParserWorker(firefox_path, debug, pages_per_driver, url_timeout, cache_dir, load_profile, viewports,
+                           parse_timeout, stage_timeouts, retries)
+    _store = ResultStore(output_dir, output_format, archive)
+    # atexit handlers never run in forked pool workers, multiprocessing finalizers do
+    Finalize(_worker, _worker.close, exitpriority=10)
+
+
+def _parse_url(url: str) -> Tuple[str, str, str, dict]:
+    _worker.last_metrics = None
+    try:
+        path, error = _worker.parse(url, _store), None
+    except Exception:
+        path, error = None, traceback.format_exc()
+    metrics = dict(_worker.last_metrics or {"url": url}, failures=_worker.last_failures)
+    return url, path, error, metrics
+
+
+def run_batch(urls: Iterable[str], output_dir: str, firefox_path: str, workers: int = None, debug: bool = False,
+              pages_per_driver: int = 50, url_timeout: float = 120,
+              metrics_path: str = None, cache_dir: str = None,
+              load_profile: LoadProfile = None, output_format: str = "parquet", resume: bool = True,
+              excel_path: str = None, viewports: List[Tuple[int, int]] = None, parse_timeout: float = None,
+              stage_timeouts: Dict[str, float] = None, retries: int = 2, archive: bool = False) -> List[Tuple[str, str, str]]:
+    workers = workers or os.cpu_count() or 1
+    store = ResultStore(output_dir, output_format, archive)
+    urls = list(urls)
+    if resume:
+        urls = store.pending(urls)
+    sink = JsonLinesSink(metrics_path) if metrics_path else None
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(firefox_path, debug, pages_per_driver, url_timeout, cache_dir, load_profile,
+                                       output_dir, output_format, archive, viewports, parse_timeout, stage_timeouts,
+                                       retries)) as executor:
+        futures = [executor.submit(_parse_url, url) for url in urls]
+        for future in as_completed(futures):
+            url, path, error, metrics = future.result()
+            print(url)
+            if error:
+                print("                   Error: ", error)
+            if sink:
+                sink.write(dict(metrics, error=error))
+            results.append((url, path, error))
+
+    if excel_path:
+        store.export_excel(excel_path)
+    return results
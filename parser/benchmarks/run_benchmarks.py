@@ -0,0 +1,164 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from blocks_parser import Parser  # noqa: E402
+from load_profile import LoadProfile  # noqa: E402
+
+fixtures_dir = os.path.join(benchmarks_dir, "fixtures")
+results_dir = os.path.join(benchmarks_dir, "results")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=fixtures_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def list_fixtures() -> List[str]:
+    return sorted(name[:-len(".html")] for name in os.listdir(fixtures_dir) if name.endswith(".html"))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=benchmarks_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def python_max_rss_bytes() -> int:
+    # this process only, firefox and geckodriver run in processes of their own
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run(fixtures: List[str], repeat: int, firefox_path: str, lean: bool) -> dict:
+    server = serve_fixtures()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    parser = Parser(firefox_path=firefox_path, load_profile=LoadProfile.lean() if lean else None)
+    results = []
+    python_peak_bytes = {}
+    try:
+        for fixture in fixtures:
+            url = f"{base_url}/{fixture}.html"
+            for attempt in range(repeat):
+                started = time.perf_counter()
+                df = parser.parse(url)
+                wall = time.perf_counter() - started
+
+                metrics = parser.metrics.to_dict()
+                results.append({
+                    "fixture": fixture,
+                    "run": attempt,
+                    "wall": wall,
+                    "blocks": df.shape[0],
+                    "stages": metrics["stages"],
+                    "commands": metrics["commands"],
+                    "commands_total": metrics["commands_total"],
+                    "elements": metrics["elements"],
+                })
+                print(f"{fixture} #{attempt}: {wall:.3f}s, {metrics['commands_total']} commands, {df.shape[0]} blocks")
+
+            # tracemalloc slows every allocation down, so the peak is taken in an extra untimed run
+            tracemalloc.start()
+            parser.parse(url)
+            python_peak_bytes[fixture] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        parser.close()
+        server.shutdown()
+
+    return {
+        "commit": git_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lean_profile": lean,
+        "python_max_rss_bytes": python_max_rss_bytes(),
+        "python_peak_bytes": python_peak_bytes,
+        "results": results,
+    }
+
+
+def summarize(report: dict) -> dict:
+    by_fixture = {}
+    for result in report["results"]:
+        by_fixture.setdefault(result["fixture"], []).append(result)
+    return {
+        fixture: {
+            "wall": statistics.median(result["wall"] for result in results),
+            "commands_total": statistics.median(result["commands_total"] for result in results),
+            "python_peak_bytes": report["python_peak_bytes"].get(fixture),
+        }
+        for fixture, results in by_fixture.items()
+    }
+
+
+def compare(base_path: str, head_path: str) -> None:
+    with open(base_path, encoding="utf-8") as file:
+        base = summarize(json.load(file))
+    with open(head_path, encoding="utf-8") as file:
+        head = summarize(json.load(file))
+    print(f"{'fixture':<16}{'base, s':>10}{'head, s':>10}{'ratio':>8}{'commands':>18}")
+    for fixture in sorted(set(base) & set(head)):
+        before, after = base[fixture], head[fixture]
+        ratio = after["wall"] / before["wall"] if before["wall"] else float("inf")
+        commands = f"{before['commands_total']:.0f} -> {after['commands_total']:.0f}"
+        print(f"{fixture:<16}{before['wall']:>10.3f}{after['wall']:>10.3f}{ratio:>8.2f}{commands:>18}")
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description="Benchmark Parser.parse on the bundled html fixtures")
+    arguments.add_argument("--firefox-path", default=r'C:\Program Files\Mozilla Firefox\firefox.exe')
+    arguments.add_argument("--fixtures", nargs="*", default=None, help=f"subset of {list_fixtures()}")
+    arguments.add_argument("--repeat", type=int, default=3)
+    arguments.add_argument("--lean", action="store_true", help="use LoadProfile.lean()")
+    arguments.add_argument("--output", default=None, help="json file, results/<time>-<commit>.json by default")
+    arguments.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="compare two result files")
+    args = arguments.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.fixtures or list_fixtures(), args.repeat, args.firefox_path, args.lean)
+    output = args.output
+    if output is None:
+        os.makedirs(results_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(results_dir, f"{stamp}-{report['commit']}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,345 +1,282 @@
-import io
-from typing import List
+from typing import List, Tuple
+import numpy as np
 import pandas as pd
 import os
 import re
-from PIL import Image
-import uuid
 
 from selenium import webdriver
-from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver import FirefoxOptions
 from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.color import Color
+
+from element_table import ELEMENT_TYPES, NO_VALUE, TYPE_CODES, ElementTable, intern
+from elements_index import ElementsIndex
+from features import BlockBounds, FeaturePipeline
+from load_profile import LoadProfile
+from metrics import ParserMetrics, count_driver_commands, timed
+from page_scripts import COLLECT_TEXT_SCRIPT, EXTRACT_ELEMENTS_SCRIPT
+from result_cache import ResultCache
+from screenshots import ScreenshotPipeline
+from segmentation import COLORED_BLOCK, HEAD_TEXT, NO_COLOR, segment_blocks, select_semantic_rows
+from colors import color_to_hex
+from text_table import TextTable
 
 
 class Parser:
-    def __init__(self, screenshot_path = "", firefox_path: str = r'C:\Program Files\Mozilla Firefox\firefox.exe', debug=False):
-        self.driver = webdriver.Firefox(
-            options=self.get_options(firefox_path=firefox_path), service=self.get_service())
+    def __init__(self, screenshot_path = "", firefox_path: str = r'C:\Program Files\Mozilla Firefox\firefox.exe', debug=False,
+                 min_block_height: float = 30, min_block_width_ratio: float = 0.7, cache: ResultCache = None,
+                 load_profile: LoadProfile = None):
+        self.metrics = ParserMetrics()
+        self.load_profile = load_profile or LoadProfile()
+        self.driver = self.create_driver(firefox_path)
         self.screenshot_path = screenshot_path
         self.debug = debug
+        self.min_block_height = min_block_height
+        self.min_block_width_ratio = min_block_width_ratio
+        self.cache = cache
+        self.screenshot_files = []
+        self.screenshots = ScreenshotPipeline()
+        self.features = FeaturePipeline()
         self.maps_regex = re.compile(
             "(.+\/www.google.com\/maps\/.+)|(.+\/yandex.ru\/map\/.+)")
         self.header_regex = re.compile("header")
         self.font_regex = re.compile("(\d+)[\w\%]{1,3}")
         self.title_regex = re.compile(".*[Tt]itle.*")
         self.not_input_regex = re.compile("^((?![Ii]nput).)*$")
+        self.head_tags = ['h1', 'h2', 'h3']
+
+    def create_driver(self, firefox_path: str) -> webdriver.Firefox:
+        driver = webdriver.Firefox(
+            options=self.get_options(firefox_path=firefox_path), service=self.get_service())
+        count_driver_commands(driver, lambda: self.metrics)
+        self.load_profile.apply_driver(driver)
+        return driver
+
+    def close(self) -> None:
+        self.screenshots.close()
+        self.driver.quit()
 
-    def parse(self, url: str) -> pd.DataFrame:
+    @timed()
+    def load_page(self, url: str) -> None:
         self.driver.get(url)
+        self.load_profile.wait_until_ready(self.driver)
         # self.driver.maximize_window()
         # self.driver.execute_script("window.scrollBy(0, document.body.scrollHeight)")
         # self.driver.execute_script("window.scrollBy(0, 0)")
 
-        self.page_height = self.get_page_height()
-        self.page_width = self.get_page_width()
-
-        self.min_block_height = 30
-        self.min_block_width = 0.7 * self.page_width
+    def parse(self, url: str, viewports: List[Tuple[int, int]] = None) -> pd.DataFrame:
+        self.metrics = ParserMetrics(url)
+        with self.metrics.stage("parse"):
+            if viewports:
+                return self.run_parse_viewports(url, viewports)
+            return self.run_parse(url)
+
+    def run_parse(self, url: str) -> pd.DataFrame:
+        self.load_page(url)
+        return self.analyze_page(url)
+
+    def run_parse_viewports(self, url: str, viewports: List[Tuple[int, int]]) -> pd.DataFrame:
+        # the page is loaded once, every viewport only resizes the window and measures it again
+        self.load_page(url)
+        window_size = self.driver.get_window_size()
+        screenshot_path = self.screenshot_path
+        frames = []
+        try:
+            for width, height in viewports:
+                viewport = f"{width}x{height}"
+                self.resize_window(width, height)
+                if screenshot_path:
+                    self.screenshot_path = os.path.join(screenshot_path, viewport)
+                    os.makedirs(self.screenshot_path, exist_ok=True)
+                df = self.analyze_page(url)
+                df.insert(0, "viewport", viewport)
+                frames.append(df)
+        finally:
+            self.screenshot_path = screenshot_path
+            self.driver.set_window_size(window_size["width"], window_size["height"])
+        return pd.concat(frames, ignore_index=True)
+
+    @timed()
+    def resize_window(self, width: int, height: int) -> None:
+        self.driver.set_window_size(width, height)
+        self.load_profile.wait_until_ready(self.driver)
+
+    def analyze_page(self, url: str) -> pd.DataFrame:
+        with self.metrics.stage("page_size"):
+            self.page_height = self.get_page_height()
+            self.page_width = self.get_page_width()
+
+        self.min_block_width = self.min_block_width_ratio * self.page_width
 
         if self.debug:
             print(self.page_width, self.page_height)
 
         elements_data = self.collect_elements_data()
+        text_data = self.collect_text_data()
 
-        data = {
-            "x": [],
-            "y": [],
-            "width": [],
-            "height": [],
-            "images_number": [],
-            "buttons_number": [],
-            "different_buttons_number": [],
-            "links_number": [],
-            "max_font_size": [],
-            "words_number": [],
-            "background_color": [],
-            "contains_map": [],
-            "contains_buttons": [],
-            "contains_forms": [],
-            "contains_head_texts": [],
-            "contains_slider": [],
-            "contains_images": [],
-        }
+        return self.analyze_collected(url, elements_data, text_data)
 
-        semantic_blocks = elements_data.loc[elements_data["type"].isin(
-            ["head_text", "colored_block"])]
-        semantic_blocks = semantic_blocks.sort_values("y")
-        semantic_blocks["counter"] = 1
-        semantic_blocks = semantic_blocks.groupby('y').agg({
-            "type": "first",
-            "width": "max",
-            "height": "max",
-            "x": "min",
-            "background_color": "first",
-            "counter": "count"
-        })
-        semantic_blocks = semantic_blocks[semantic_blocks["counter"] == 1]
-        semantic_blocks = semantic_blocks.reset_index()
+    def analyze_collected(self, url: str, elements_data: ElementTable, text_data: dict) -> pd.DataFrame:
+        self.metrics.count_elements(len(elements_data))
 
-        if self.debug:
-            print(semantic_blocks.to_string())
-
-        accum_block = semantic_blocks.iloc[0].to_dict()
-        accum_block["height"] = 0
-        accum_block["blocks_count"] = 1
-        accum_block["y_end"] = self.page_height
-        
-        for i, current_block in semantic_blocks.iterrows():
-            print(i)
-
-            next_block = None
-            if i == (semantic_blocks.shape[0] - 1):
-                next_block = {
-                    "x": 0,
-                    "y": self.page_height,
-                    "height": 0,
-                    "width": 0,
-                    "background_color": None,
-                    "type": "colored_block"
-                }
-            else:
-                next_block = semantic_blocks.iloc[i + 1].to_dict()
-
-            if not (current_block["type"] == "colored_block" and next_block["type"] == "colored_block") \
-                and current_block["x"] < next_block["x"] \
-                    and i >= 2:
-                # and current_block["height"] > self.min_block_height:
-                    accum_block["y_end"] = accum_block["y"] + current_block["height"]
-                    continue
-            
-            
-            if next_block["y"] - accum_block["y"] < self.min_block_height:
-                continue
-            
-            # elems_between = elements_data[(~elements_data["type"].isin(["head_text", "colored_block"])) \
-            #                                       & elements_data["y"].between(accum_block["y"], next_block["y"] - 2)]
-            # if self.debug:
-            #     print("Elems between", elems_between.shape[0])
-            # if elems_between.shape[0] < 1:
-            #     continue
-
-            accum_block["height"] = next_block["y"] - accum_block["y"]
-
-            if current_block["background_color"] == next_block["background_color"] \
-                    and i != (semantic_blocks.shape[0] - 1) \
-                        and not (current_block["type"] == "head_text" and next_block["type"] == "head_text"):
-                accum_block["blocks_count"] += 1
-                accum_block["background_color"] = current_block["background_color"]
-            else:                
-                if accum_block["blocks_count"] < 2 \
-                        and accum_block["height"] > current_block["height"] \
-                                and (current_block["type"] == "colored_block" and next_block["type"] == "colored_block"):
-                    self.collect_block_data(elements_data, data,
-                                            0, accum_block["y"],
-                                            self.page_width, accum_block["y"] + current_block["height"],
-                                            current_block["background_color"])
-                    self.collect_block_data(elements_data, data,
-                                            0, accum_block["y"] + current_block["height"],
-                                            self.page_width, accum_block["y"] + accum_block["height"],
-                                            accum_block["background_color"])
-                else:
-                    self.collect_block_data(elements_data, data,
-                                            0, accum_block["y"],
-                                            self.page_width, accum_block["y"] + accum_block["height"],
-                                            accum_block["background_color"])
-                accum_block["y"] = next_block["y"]
-                accum_block["y_end"] = next_block["y"] + next_block["height"]
-                accum_block["height"] = 0
-                accum_block["blocks_count"] = 1
-                
-        df = pd.DataFrame(data)
-        return df
+        key = None
+        if self.cache is not None:
+            with self.metrics.stage("cache_lookup"):
+                key = self.cache.make_key(url, elements_data, text_data, self.get_config())
+                df = self.cache.get(key, self.screenshot_path if self.debug else None)
+            if df is not None:
+                return df
 
-    def collect_block_data(self, elements_data: dict, data: dict, x_begin: float,
-                           y_begin: float, x_end: float, y_end: float, background_color: str):
+        self.text_table = self.build_text_table(text_data)
+        df = self.analyze(elements_data)
 
-        if self.debug:
-            block_shot_path = os.path.join(
-                self.screenshot_path, f"{y_begin}-{y_end}.png")
-            print(block_shot_path)
-            self.take_screenshot(block_shot_path, x_begin, y_begin,
-                                 x_end - x_begin, (y_end - y_begin))
-
-        data["x"].append(x_begin)
-        data["y"].append(y_begin)
-        data["width"].append(x_end - x_begin)
-        data["height"].append(y_end - y_begin)
-
-        images_number = elements_data.loc[(elements_data["type"] == "image")
-                                          & (elements_data["y"].between(y_begin, y_end))].shape[0]
-        data["images_number"].append(images_number)
-        data["contains_images"].append(images_number > 0)
-
-        data["max_font_size"].append(
-            self.get_max_font_size(y_begin, y_end))
-
-        data["words_number"].append(
-            self.get_words_number(y_begin, y_end))
-
-        maps = elements_data.loc[(elements_data["type"] == "map")
-                                 & (elements_data["y"].between(y_begin, y_end))]
-        data["contains_map"].append(not maps.empty)
-
-        buttons_number = elements_data.loc[(elements_data["type"] == "button")
-                                           & (elements_data["y"].between(y_begin, y_end))].shape[0]
-        links_number = elements_data.loc[(elements_data["type"] == "link")
-                                         & (elements_data["y"].between(y_begin, y_end))].shape[0]
-        data["contains_buttons"].append(buttons_number + links_number > 0)
-        data["buttons_number"].append(buttons_number)
-        data["links_number"].append(links_number)
-
-        forms = elements_data.loc[(elements_data["type"] == "form")
-                                  & (elements_data["y"].between(y_begin, y_end))]
-        data["contains_forms"].append(not forms.empty)
-
-        head_texts = elements_data.loc[(elements_data["type"] == "head_text")
-                                       & (elements_data["y"].between(y_begin, y_end))]
-        data["contains_head_texts"].append(not head_texts.empty)
-
-        sliders = elements_data.loc[(elements_data["type"] == "slider")
-                                    & (elements_data["y"].between(y_begin, y_end))]
-        data["contains_slider"].append(not sliders.empty)
-
-        all_buttons = elements_data.loc[(elements_data["type"] == "button")
-                                        & (elements_data["y"].between(y_begin, y_end))]
-        different_buttons_number = all_buttons.groupby(
-            "text").first().shape[0]
-        data["different_buttons_number"].append(different_buttons_number)
-
-        data["background_color"].append(background_color)
-
-    def collect_elements_data(self) -> pd.DataFrame:
-
-        elements_data = {
-            "type": [],
-            "x": [],
-            "y": [],
-            "width": [],
-            "height": [],
-            "text": [],
-            "background_color": []
+        if key is not None:
+            with self.metrics.stage("cache_store"):
+                self.cache.put(key, url, df, self.screenshot_files)
+        return df
+
+    def get_config(self) -> dict:
+        return {
+            "min_block_height": self.min_block_height,
+            "min_block_width_ratio": self.min_block_width_ratio,
+            "debug": self.debug,
         }
-        
-        elements_data["type"].append("head_text")
-        elements_data["x"].append(0)
-        elements_data["y"].append(0)
-        elements_data["width"].append(self.page_width)
-        elements_data["height"].append(self.min_block_height)
-        elements_data["background_color"].append(None)
-        elements_data["text"].append(None)
-        
 
-        imgs = self.get_imgs(self.driver)
-        self.collect_coords_data(elements_data, imgs, "image")
+    def analyze(self, elements_data: ElementTable) -> pd.DataFrame:
+        self.screenshot_files = []
+        with self.metrics.stage("elements_index"):
+            elements_index = ElementsIndex(elements_data)
+        blocks = self.segment(elements_data)
 
-        heads = self.get_heads(self.driver)
-        self.collect_coords_data(elements_data, heads, "head_text")
+        if self.debug:
+            self.screenshots.load(self.get_full_page_screenshot())
+        df = self.collect_blocks_data(elements_index, blocks)
+        with self.metrics.stage("screenshot_writes"):
+            self.screenshots.wait()
+        return df
 
-        buttons = self.get_buttons(self.driver)
-        self.collect_coords_data(elements_data, buttons, "button")
+    @timed()
+    def segment(self, elements_data: ElementTable) -> List[Tuple[float, float, float, float, str]]:
+        semantic_blocks = elements_data.take(elements_data.type_mask("head_text", "colored_block"))
+        semantic_blocks = semantic_blocks.take(select_semantic_rows(semantic_blocks.y))
 
-        links = self.get_links(self.driver)
-        self.collect_coords_data(elements_data, links, "link")
+        if self.debug:
+            print(semantic_blocks.to_frame().to_string())
+
+        # interned color ids already are NO_COLOR for missing colors
+        bounds = segment_blocks(
+            semantic_blocks.y,
+            semantic_blocks.x.astype(float),
+            semantic_blocks.height,
+            np.where(semantic_blocks.types == TYPE_CODES["colored_block"], COLORED_BLOCK, HEAD_TEXT),
+            semantic_blocks.color_ids,
+            self.page_height, self.min_block_height)
+        return [(0, y_begin, self.page_width, y_end, elements_data.colors[color] if color != NO_COLOR else None)
+                for y_begin, y_end, color in bounds]
+
+    @timed()
+    def collect_blocks_data(self, elements_index: ElementsIndex,
+                            blocks: List[Tuple[float, float, float, float, str]]) -> pd.DataFrame:
+        if self.debug and self.can_take_screenshots():
+            for x0, y0, x1, y1, _ in blocks:
+                block_shot_path = os.path.join(
+                    self.screenshot_path, f"{y0}-{y1}.png")
+                print(block_shot_path)
+                self.take_screenshot(block_shot_path, x0, y0, x1 - x0, (y1 - y0))
+
+        return self.features.run({
+            "blocks": lambda: BlockBounds(blocks),
+            "elements": lambda: elements_index,
+            "text": lambda: self.text_table,
+        })
 
-        forms = self.get_forms(self.driver)
-        self.collect_coords_data(elements_data, forms, "form")
+    @timed()
+    def collect_elements_data(self) -> ElementTable:
+        columns = self.collect_element_columns(self.min_block_height, self.min_block_width)
+        return self.build_elements_data(columns)
+
+    def collect_element_columns(self, min_block_height: float, min_block_width: float, **window) -> dict:
+        return self.extracted_columns(self.driver.execute_script(EXTRACT_ELEMENTS_SCRIPT, dict(window, **{
+            "maps_regex": self.maps_regex.pattern,
+            "min_block_height": min_block_height,
+            "min_block_width": min_block_width,
+        })))
+
+    def extracted_columns(self, extracted: dict) -> dict:
+        # the script times the document scan and every element type inside the page
+        for name, milliseconds in extracted["timings"].items():
+            self.metrics.add_stage(f"extract_{name}", milliseconds / 1000)
+        return extracted["columns"]
+
+    def build_elements_data(self, columns: dict, max_head_font_size: int = None,
+                            with_page_start: bool = True) -> ElementTable:
+        types = pd.Categorical(columns["type"], categories=ELEMENT_TYPES).codes.astype(np.int8)
+        x = np.asarray(columns["x"], dtype=float)
+        y = np.asarray(columns["y"], dtype=float)
+        width = np.asarray(columns["width"], dtype=float)
+        height = np.asarray(columns["height"], dtype=float)
+
+        is_head = types == TYPE_CODES["head_text"]
+        font_sizes = np.zeros(len(types), dtype=int)
+        font_sizes[is_head] = [self.parse_font_size(value)
+                               for value in np.asarray(columns["font_size"], dtype=object)[is_head]]
+        if max_head_font_size is None:
+            max_head_font_size = font_sizes[is_head].max(initial=0)
+        min_font_size = max_head_font_size * 0.8
+
+        is_colored = types == TYPE_CODES["colored_block"]
+        keep = ~(is_head & ~np.isin(np.asarray(columns["tag"], dtype=object), self.head_tags)
+                 & (font_sizes <= min_font_size))
+        keep &= ~(is_colored & ((height < self.min_block_height) | (width < self.min_block_width)))
+        types, x, y, width, height = types[keep], x[keep], y[keep], width[keep], height[keep]
+
+        texts = np.asarray(columns["text"], dtype=object)[keep]
+        texts[~np.isin(types, [TYPE_CODES["button"], TYPE_CODES["link"]])] = None
+        text_ids, text_pool = intern(texts)
+
+        # css colors are converted once per distinct value
+        has_color = np.isin(types, [TYPE_CODES["colored_block"], TYPE_CODES["head_text"]])
+        css_ids, css_pool = intern(np.asarray(columns["background_color"], dtype=object)[keep][has_color],
+                                   keep_none=True)
+        hex_ids, color_pool = intern([self.parse_background_color(value) for value in css_pool])
+        color_ids = np.full(len(types), NO_VALUE, dtype=np.int32)
+        color_ids[has_color] = hex_ids[css_ids]
+
+        elements = ElementTable(types, x, y, width, height, text_ids, color_ids, text_pool, color_pool)
+        if with_page_start:
+            elements = ElementTable.concat([self.page_start_elements(), elements])
+        return elements
 
-        maps = self.get_map(self.driver)
-        self.collect_coords_data(elements_data, maps, "map")
+    def page_start_elements(self) -> ElementTable:
+        # the page top always starts a block
+        return ElementTable([TYPE_CODES["head_text"]], [0], [0], [self.page_width],
+                            [self.min_block_height], [NO_VALUE], [NO_VALUE])
 
-        colored_blocks = self.get_colored_blocks(self.driver)
-        self.collect_coords_data(
-            elements_data, colored_blocks, "colored_block")
+    def collect_text_table(self) -> TextTable:
+        return self.build_text_table(self.collect_text_data())
 
-        sliders = self.get_sliders(self.driver)
-        self.collect_coords_data(elements_data, sliders, "slider")
+    @timed()
+    def collect_text_data(self) -> dict:
+        return self.driver.execute_script(COLLECT_TEXT_SCRIPT)
 
-        df = pd.DataFrame(elements_data)
-        return df
+    def build_text_table(self, texts: dict) -> TextTable:
+        words = texts["words"]
+        fonts = texts["fonts"]
+        return TextTable([word[0] for word in words], [word[1] for word in words],
+                         [font[0] for font in fonts], [self.parse_font_size(font[1]) for font in fonts])
 
-    def collect_coords_data(self, data: dict, elements: List[WebElement], type: str):
-        for element in elements:
-            data["type"].append(type)
-            data["x"].append(self.get_x(element))
-            data["y"].append(self.get_y(element))
-            data["width"].append(self.get_width(element))
-            data["height"].append(self.get_height(element))
-            if type in ["button", "link"]:
-                data["text"].append(element.text)
-            else:
-                data["text"].append(None)
-
-            if type in ["colored_block", "head_text"]:
-                data["background_color"].append(
-                    self.get_background_color(element))
-            else:
-                data["background_color"].append(None)
-
-    def get_blocks(self, block: WebElement) -> List[WebElement]:
-        blocks = block.find_elements(By.CSS_SELECTOR, "div, section, main, header, footer, a, *::before, *::after")
-
-        blocks = [elem for elem in blocks if self.is_displayed(elem)]
-        return blocks
+    def can_take_screenshots(self) -> bool:
+        return self.screenshots.pixels is not None
 
     def take_screenshot(self, path: str, x: float, y: float, width: float, height: float) -> None:
-        data = self.driver.get_full_page_screenshot_as_png()
-        screenshot = Image.open(io.BytesIO(data))
         area = (x, y, x + width, min(y + height, self.page_height))
         print(area)
-        block_screen = screenshot.crop(area)
-        block_screen.save(path)
-
-    def get_colored_blocks(self, block: WebElement) -> List[WebElement]:
-        blocks = self.get_blocks(block)
-        all_blocks = [[self.get_y(t_block), t_block] for t_block in blocks]
-        all_blocks.sort(key=lambda x: x[0])
-        colored_blocks = []
-        current_block = None
-        for colored_block in all_blocks:
-            current_block : WebElement = colored_block[1]
-            cur_color = self.get_background_color(current_block)
-            if (not cur_color) \
-                or (self.get_height(current_block) < self.min_block_height) \
-                    or (self.get_width(current_block) < self.min_block_width) \
-                    or not self.is_displayed(current_block):
-                continue
-
-            colored_blocks.append(current_block)
-        return colored_blocks
-
-    def get_background_image(self, block: WebElement) -> str:
-        back_image = block.value_of_css_property("background-image")
-        if back_image == "" or back_image == "none":
-            return None
-        else:
-            return back_image
-
-    def get_heads(self, block: WebElement) -> List[WebElement]:
-        tags = ['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', "h6"]
-        heads = ['h1', 'h2', 'h3']
-        elements = []
-        for tag in tags:
-            elements += [[self.get_font_size(elem), elem] for elem in block.find_elements(By.CSS_SELECTOR, f'{tag}')
-                         if self.is_displayed(elem)]
-        pair = max(elements, key=lambda x: x[0])
-        min_font_size = pair[0] * 0.8
-        elements = [elem[1] for elem in elements if elem[1].tag_name in heads or (elem[0] > min_font_size)]
-            # (self.title_regex.match(elem[1].get_attribute('class')) != None and self.not_input_regex.fullmatch(elem[1].get_attribute('class'))))]
-        return elements
+        self.screenshots.save(path, x, y, width, area[3] - y)
+        self.screenshot_files.append(path)
 
-    def get_forms(self, block: WebElement) -> List[WebElement]:
-        forms = block.find_elements(By.CSS_SELECTOR, 'div[class*="form"], div[id*="form"], form')
-        forms = [elem for elem in forms if self.is_displayed(elem)]
-        return forms
-
-    def get_sliders(self, block: WebElement) -> List[WebElement]:
-        sliders = self.driver.find_elements(
-            By.CSS_SELECTOR, 'div[class*="slider"]')
-        sliders = [elem for elem in sliders if self.is_displayed(elem)]
-        return sliders
+    @timed()
+    def get_full_page_screenshot(self) -> bytes:
+        return self.driver.get_full_page_screenshot_as_png()
 
     def get_page_height(self) -> float:
         page = self.driver.find_element(By.TAG_NAME, "body")
@@ -359,113 +296,27 @@ class Parser:
         # options.set_preference(
         #     'dom.ipc.plugins.enabled.libflashplayer.so', 'false')
         options.binary_location = firefox_path
+        self.load_profile.apply_options(options)
         return options
 
     def get_service(self,) -> Service:
-        gecko = os.path.normpath(os.path.join(
-            os.path.dirname(__file__), 'geckodriver.exe'))
-        service = Service(executable_path=gecko,)
+        service = Service(executable_path=self.get_geckodriver_path(),)
         return service
 
-    def get_x(self, element: WebElement) -> float:
-        try:
-            x = element.rect["x"]
-            return abs(x)
-        except:
-            return float('inf')
-
-    def get_y(self, element: WebElement) -> float:
-        try:
-            y = element.rect["y"]
-            return abs(y)
-        except:
-            return float('inf')
-
-    def get_width(self, element: WebElement) -> float:
-        try:
-            width = element.size['width']
-            return width
-        except:
-            return float('inf')
-
-    def get_height(self, element: WebElement) -> float:
-        try:
-            height = element.size['height']
-            return height
-        except:
-            return float('inf')
-
-    def get_buttons(self, block: WebElement) -> List[WebElement]:
-        buttons = block.find_elements(By.CSS_SELECTOR,
-                                       'input[type*="button"], button')
-        buttons += [elem for elem in block.find_elements(By.TAG_NAME, "a") if self.get_background_color(elem) is not None]
-        buttons = [button for button in buttons if self.is_displayed(button)]
-        return buttons
-
-    def get_links(self, block: WebElement) -> List[WebElement]:
-        links = block.find_elements(By.TAG_NAME, "a")
-        links = [elem for elem in links if self.is_displayed(elem) and self.get_background_color(elem) is None]
-        return links
-
-    def get_map(self, block: WebElement) -> List[WebElement]:
-        maps = block.find_elements(By.CSS_SELECTOR, 'ymaps, *[id*="map"], div[class*="map"]')
-        iframes = block.find_elements(By.TAG_NAME, "iframe")
-        maps += [iframe for iframe in iframes if self.maps_regex.search(
-            iframe.get_attribute("src"))]
-        maps = [elem for elem in maps if self.is_displayed(elem)]
-        return maps
+    def get_geckodriver_path(self) -> str:
+        return os.path.normpath(os.path.join(
+            os.path.dirname(__file__), 'geckodriver.exe'))
 
     def get_words_number(self, y_min: float, y_max: float, x_min: float = 0, x_max: float = float("inf")) -> int:
-        elements = [elem for elem in self.driver.find_elements(By.CSS_SELECTOR, "*:not(script, iframe)")
-                    if y_min <= self.get_y(elem) <= y_max and self.is_displayed(elem)]
-        words_number = 0
-        for element in elements:
-            words_number += len(element.text.split())
-        return words_number
+        return self.text_table.words_number(y_min, y_max)
     
-    def is_displayed(self, element: WebElement):
-        try:
-            return element.is_displayed()
-        except:
-            return False
-    
-    def get_font_size(self, element: WebElement):
-        try:
-            font_size = element.value_of_css_property("font-size")
-            match = self.font_regex.search(font_size)
-            font_size_value = int(match.group(1)) if match else 0
-            return font_size_value
-        except:
-            return 0
+    def parse_font_size(self, font_size: str) -> int:
+        match = self.font_regex.search(font_size or "")
+        font_size_value = int(match.group(1)) if match else 0
+        return font_size_value
 
     def get_max_font_size(self, y_min: float, y_max: float, x_min: float = 0, x_max: float = float("inf")) -> int:
-        tags = ['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'table']
-        elements = []
-        for tag in tags:
-            elements += [elem for elem in self.driver.find_elements(By.CSS_SELECTOR, f'{tag}')
-                         if y_min <= self.get_y(elem) <= y_max and self.is_displayed(elem)]
-        max_font_size = 0
-        for element in elements:
-            font_size_value = self.get_font_size(element)
-            max_font_size = max(int(font_size_value), max_font_size)
-        return max_font_size
-
-    def get_background_color(self, block: WebElement) -> str:
-        try:
-            value = block.value_of_css_property("background-color")
-            color = Color.from_string(value)
-            if color.alpha == "0":
-                return None
-            return color.hex
-        except ValueError:
-            id = uuid.uuid1()
-            return Color.from_string(f"#{id[:6]}").hex
-
-    def get_imgs(self, block: WebElement) -> List[WebElement]:
-        imgs = block.find_elements(By.TAG_NAME, "img")
-        img_classes = ["img", "Image", "image", "Img"]
-        for img_class in img_classes:
-            imgs += block.find_elements(By.CSS_SELECTOR,
-                                               "div[class*='{}']".format(img_class))
-        imgs = [elem for elem in imgs if self.is_displayed(elem)]
-        return imgs
+        return self.text_table.max_font_size(y_min, y_max)
+
+    def parse_background_color(self, value: str) -> str:
+        return color_to_hex(value)
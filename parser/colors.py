@@ -0,0 +1,33 @@
+import re
+import uuid
+from functools import lru_cache
+
+from selenium.webdriver.support.color import Color
+
+
+rgb_regex = re.compile(r"^rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*([\d.]+)\s*)?\)$")
+
+
+def color_to_hex(value: str) -> str:
+    try:
+        return parse_color(value)
+    except ValueError:
+        # an unknown color gets a new random one on every call, the cache must not pin it
+        return Color.from_string(f"#{uuid.uuid1().hex[:6]}").hex
+
+
+@lru_cache(maxsize=4096)
+def parse_color(value: str) -> str:
+    # computed colors are almost always rgb()/rgba(), Color.from_string handles the rest
+    if value is None:
+        return None
+    match = rgb_regex.match(value)
+    if match:
+        red, green, blue, alpha = match.groups()
+        if alpha == "0":
+            return None
+        return "#{:02x}{:02x}{:02x}".format(int(red), int(green), int(blue))
+    color = Color.from_string(value)
+    if color.alpha == "0":
+        return None
+    return color.hex
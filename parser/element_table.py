@@ -0,0 +1,103 @@
+import hashlib
+import json
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+ELEMENT_TYPES = ("head_text", "colored_block", "image", "button", "link", "form", "map", "slider")
+TYPE_CODES = {name: code for code, name in enumerate(ELEMENT_TYPES)}
+# id of a missing text or color in the pools
+NO_VALUE = -1
+
+
+def intern(values: Sequence, keep_none: bool = False):
+    # ids into a pool of distinct values in order of appearance,
+    # None gets NO_VALUE unless it is kept as a value
+    pool = {}
+    ids = [NO_VALUE if value is None and not keep_none else pool.setdefault(value, len(pool)) for value in values]
+    return np.array(ids, dtype=np.int32), list(pool)
+
+
+class ElementTable:
+    # one row per page element: int8 type codes, float32 x/width, float64 y/height since
+    # they end up as block bounds, and ids into the shared text and color pools
+    def __init__(self, types, x, y, width, height, text_ids, color_ids,
+                 texts: List[str] = (), colors: List[str] = ()):
+        self.types = np.asarray(types, dtype=np.int8)
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.width = np.asarray(width, dtype=np.float32)
+        self.height = np.asarray(height, dtype=np.float64)
+        self.text_ids = np.asarray(text_ids, dtype=np.int32)
+        self.color_ids = np.asarray(color_ids, dtype=np.int32)
+        self.texts = list(texts)
+        self.colors = list(colors)
+
+    @classmethod
+    def empty(cls) -> "ElementTable":
+        return cls([], [], [], [], [], [], [])
+
+    @classmethod
+    def concat(cls, tables: Sequence["ElementTable"]) -> "ElementTable":
+        texts, colors = {}, {}
+        text_ids, color_ids = [], []
+        for table in tables:
+            text_ids.append(cls.remap(table.text_ids, table.texts, texts))
+            color_ids.append(cls.remap(table.color_ids, table.colors, colors))
+        return cls(
+            np.concatenate([table.types for table in tables]),
+            np.concatenate([table.x for table in tables]),
+            np.concatenate([table.y for table in tables]),
+            np.concatenate([table.width for table in tables]),
+            np.concatenate([table.height for table in tables]),
+            np.concatenate(text_ids), np.concatenate(color_ids),
+            list(texts), list(colors),
+        )
+
+    @staticmethod
+    def remap(ids: np.ndarray, pool: List[str], merged: dict) -> np.ndarray:
+        codes = np.array([merged.setdefault(value, len(merged)) for value in pool] + [NO_VALUE], dtype=np.int32)
+        return codes[ids]
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in
+                   (self.types, self.x, self.y, self.width, self.height, self.text_ids, self.color_ids))
+
+    def type_mask(self, *names: str) -> np.ndarray:
+        return np.isin(self.types, [TYPE_CODES[name] for name in names])
+
+    def take(self, selection) -> "ElementTable":
+        # boolean mask or row positions, the pools are shared
+        return ElementTable(self.types[selection], self.x[selection], self.y[selection],
+                            self.width[selection], self.height[selection],
+                            self.text_ids[selection], self.color_ids[selection], self.texts, self.colors)
+
+    def text_values(self) -> np.ndarray:
+        return np.array(self.texts + [None], dtype=object)[self.text_ids]
+
+    def color_values(self) -> np.ndarray:
+        return np.array(self.colors + [None], dtype=object)[self.color_ids]
+
+    def fingerprint(self) -> bytes:
+        digest = hashlib.sha256()
+        for column in (self.types, self.x, self.y, self.width, self.height, self.text_ids, self.color_ids):
+            digest.update(column.tobytes())
+        digest.update(json.dumps([self.texts, self.colors], ensure_ascii=False).encode("utf-8"))
+        return digest.digest()
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "type": np.array(ELEMENT_TYPES, dtype=object)[self.types],
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "text": self.text_values(),
+            "background_color": self.color_values(),
+        })
@@ -0,0 +1,42 @@
+import numpy as np
+
+from element_table import ELEMENT_TYPES, ElementTable
+
+
+class ElementsIndex:
+    def __init__(self, elements_data: ElementTable):
+        self.ys = {}
+        self.texts = {}
+        # rows grouped by type code and sorted by y inside each group
+        order = np.lexsort((elements_data.y, elements_data.types))
+        types = elements_data.types[order]
+        ys = elements_data.y[order]
+        texts = elements_data.text_values()[order]
+        bounds = np.flatnonzero(np.diff(types)) + 1
+        for group_types, group_ys, group_texts in zip(np.split(types, bounds), np.split(ys, bounds),
+                                                      np.split(texts, bounds)):
+            if len(group_types) and group_types[0] >= 0:
+                type = ELEMENT_TYPES[group_types[0]]
+                self.ys[type] = group_ys
+                self.texts[type] = group_texts
+
+    def range(self, type: str, y_begin, y_end):
+        # same bounds as Series.between: both ends inclusive
+        ys = self.ys.get(type, np.empty(0))
+        lo = np.searchsorted(ys, y_begin, side="left")
+        hi = np.searchsorted(ys, y_end, side="right")
+        return lo, np.maximum(hi, lo)
+
+    def count(self, type: str, y_begin, y_end):
+        lo, hi = self.range(type, y_begin, y_end)
+        return hi - lo
+
+    def contains(self, type: str, y_begin, y_end):
+        return self.count(type, y_begin, y_end) > 0
+
+    def distinct_texts(self, type: str, y_begin, y_end):
+        texts = self.texts.get(type, np.empty(0, dtype=object))
+        lo, hi = self.range(type, np.atleast_1d(y_begin), np.atleast_1d(y_end))
+        counts = np.array([len({text for text in texts[l:h] if text is not None and text == text})
+                           for l, h in zip(lo, hi)], dtype=int)
+        return counts if np.ndim(y_begin) else int(counts[0])
@@ -0,0 +1,163 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class BlockBounds:
+    def __init__(self, blocks: List[Tuple[float, float, float, float, str]]):
+        self.x_begin = np.array([block[0] for block in blocks], dtype=float)
+        self.y_begin = np.array([block[1] for block in blocks], dtype=float)
+        self.x_end = np.array([block[2] for block in blocks], dtype=float)
+        self.y_end = np.array([block[3] for block in blocks], dtype=float)
+        self.colors = [block[4] for block in blocks]
+
+
+class Feature:
+    # computes one column for all blocks of a page from the named inputs, an input is either
+    # page data ("blocks", "elements", "text") or another feature
+    def __init__(self, name: str, inputs: Tuple[str, ...], compute: Callable):
+        self.name = name
+        self.inputs = inputs
+        self.compute = compute
+
+    def __call__(self, values: dict):
+        return self.compute(*(values[name] for name in self.inputs))
+
+
+# the registration order is the column order of the result
+FEATURES: Dict[str, Feature] = {}
+
+
+def register(name: str, *inputs: str):
+    def decorator(compute: Callable) -> Callable:
+        FEATURES[name] = Feature(name, inputs, compute)
+        return compute
+    return decorator
+
+
+class FeaturePipeline:
+    # features run level by level, the ones whose inputs are ready run side by side.
+    # numpy features over the blocks of one page are cheaper than a thread handoff, so
+    # max_workers is worth raising only for features that wait on something
+    def __init__(self, features: Iterable[Feature] = None, max_workers: int = 1):
+        self.features = list(FEATURES.values() if features is None else features)
+        self.max_workers = max_workers
+        self.levels = self.plan()
+
+    def plan(self) -> List[List[Feature]]:
+        available = self.inputs
+        pending = list(self.features)
+        levels = []
+        while pending:
+            level = [feature for feature in pending if available.issuperset(feature.inputs)]
+            if not level:
+                raise ValueError(f"Circular feature inputs: {[feature.name for feature in pending]}")
+            levels.append(level)
+            available |= {feature.name for feature in level}
+            pending = [feature for feature in pending if feature.name not in available]
+        return levels
+
+    @property
+    def inputs(self) -> set:
+        # page data the features need, everything else is produced by the pipeline
+        produced = {feature.name for feature in self.features}
+        return {name for feature in self.features for name in feature.inputs if name not in produced}
+
+    def run(self, inputs: Dict[str, Callable[[], object]]) -> pd.DataFrame:
+        values = {name: inputs[name]() for name in self.inputs}
+        if self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for level in self.levels:
+                    values.update(zip((feature.name for feature in level), executor.map(lambda f: f(values), level)))
+        else:
+            for level in self.levels:
+                for feature in level:
+                    values[feature.name] = feature(values)
+        return pd.DataFrame({feature.name: values[feature.name] for feature in self.features})
+
+
+@register("x", "blocks")
+def block_x(blocks: BlockBounds):
+    return blocks.x_begin
+
+
+@register("y", "blocks")
+def block_y(blocks: BlockBounds):
+    return blocks.y_begin
+
+
+@register("width", "blocks")
+def block_width(blocks: BlockBounds):
+    return blocks.x_end - blocks.x_begin
+
+
+@register("height", "blocks")
+def block_height(blocks: BlockBounds):
+    return blocks.y_end - blocks.y_begin
+
+
+@register("images_number", "blocks", "elements")
+def images_number(blocks: BlockBounds, elements):
+    return elements.count("image", blocks.y_begin, blocks.y_end)
+
+
+@register("buttons_number", "blocks", "elements")
+def buttons_number(blocks: BlockBounds, elements):
+    return elements.count("button", blocks.y_begin, blocks.y_end)
+
+
+@register("different_buttons_number", "blocks", "elements")
+def different_buttons_number(blocks: BlockBounds, elements):
+    return elements.distinct_texts("button", blocks.y_begin, blocks.y_end)
+
+
+@register("links_number", "blocks", "elements")
+def links_number(blocks: BlockBounds, elements):
+    return elements.count("link", blocks.y_begin, blocks.y_end)
+
+
+@register("max_font_size", "blocks", "text")
+def max_font_size(blocks: BlockBounds, text):
+    return text.max_font_size(blocks.y_begin, blocks.y_end)
+
+
+@register("words_number", "blocks", "text")
+def words_number(blocks: BlockBounds, text):
+    return text.words_number(blocks.y_begin, blocks.y_end)
+
+
+@register("background_color", "blocks")
+def background_color(blocks: BlockBounds):
+    return blocks.colors
+
+
+@register("contains_map", "blocks", "elements")
+def contains_map(blocks: BlockBounds, elements):
+    return elements.contains("map", blocks.y_begin, blocks.y_end)
+
+
+@register("contains_buttons", "buttons_number", "links_number")
+def contains_buttons(buttons_number, links_number):
+    return buttons_number + links_number > 0
+
+
+@register("contains_forms", "blocks", "elements")
+def contains_forms(blocks: BlockBounds, elements):
+    return elements.contains("form", blocks.y_begin, blocks.y_end)
+
+
+@register("contains_head_texts", "blocks", "elements")
+def contains_head_texts(blocks: BlockBounds, elements):
+    return elements.contains("head_text", blocks.y_begin, blocks.y_end)
+
+
+@register("contains_slider", "blocks", "elements")
+def contains_slider(blocks: BlockBounds, elements):
+    return elements.contains("slider", blocks.y_begin, blocks.y_end)
+
+
+@register("contains_images", "images_number")
+def contains_images(images_number):
+    return images_number > 0
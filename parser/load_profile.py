@@ -0,0 +1,86 @@
+from typing import Iterable, Tuple
+
+from selenium.webdriver import FirefoxOptions
+
+from page_scripts import LAYOUT_STABLE_SCRIPT
+
+
+# analytics and ad requests do not take part in the page layout. The browser can only
+# filter interceptions by literal hostname, so the hosts are listed one by one and only
+# these requests are routed through Python
+TRACKER_HOSTS = [
+    "google-analytics.com",
+    "www.google-analytics.com",
+    "ssl.google-analytics.com",
+    "region1.google-analytics.com",
+    "www.googletagmanager.com",
+    "googletagmanager.com",
+    "stats.g.doubleclick.net",
+    "googleads.g.doubleclick.net",
+    "pagead2.googlesyndication.com",
+    "connect.facebook.net",
+    "mc.yandex.ru",
+    "top-fwz1.mail.ru",
+    "static.hotjar.com",
+    "script.hotjar.com",
+    "www.clarity.ms",
+    "code.jivosite.com",
+]
+
+TRACKER_PATTERNS = [f"*://{host}/**" for host in TRACKER_HOSTS]
+
+
+class LoadProfile:
+    def __init__(self, page_load_strategy: str = "normal", blocked_patterns: Iterable[str] = (),
+                 block_media: bool = False, wait_for_layout_stable: bool = False, stable_checks: int = 3,
+                 stable_interval: float = 0.25, layout_timeout: float = 10, viewport: Tuple[int, int] = None):
+        # blocked_patterns are selenium url globs, "*://host/**", with a literal hostname
+        self.page_load_strategy = page_load_strategy
+        self.blocked_patterns = list(blocked_patterns)
+        self.block_media = block_media
+        self.wait_for_layout_stable = wait_for_layout_stable
+        self.stable_checks = stable_checks
+        self.stable_interval = stable_interval
+        self.layout_timeout = layout_timeout
+        self.viewport = viewport
+
+    @classmethod
+    def lean(cls, viewport: Tuple[int, int] = None) -> "LoadProfile":
+        # the window keeps its default size unless a viewport is given, page_width and
+        # the block bounds depend on it
+        return cls(page_load_strategy="eager", blocked_patterns=TRACKER_PATTERNS, block_media=True,
+                   wait_for_layout_stable=True, viewport=viewport)
+
+    def apply_options(self, options: FirefoxOptions) -> None:
+        options.page_load_strategy = self.page_load_strategy
+        if self.viewport:
+            options.add_argument(f"--width={self.viewport[0]}")
+            options.add_argument(f"--height={self.viewport[1]}")
+        if self.block_media:
+            # video and audio are neither played nor preloaded, their boxes keep the size from css
+            options.set_preference("media.autoplay.default", 5)
+            options.set_preference("media.preload.default", 0)
+            options.set_preference("media.preload.auto", 0)
+        if self.blocked_patterns:
+            # request interception goes through WebDriver BiDi
+            options.enable_bidi = True
+
+    def apply_driver(self, driver) -> None:
+        if self.viewport:
+            driver.set_window_size(*self.viewport)
+        if self.blocked_patterns:
+            # driver.network opens the BiDi connection, it fails when BiDi is off
+            driver.network.add_request_handler(self.blocked_patterns, self.handle_request)
+
+    def handle_request(self, request) -> None:
+        # selenium continues every matched request that is not failed
+        request.fail()
+
+    def wait_until_ready(self, driver) -> bool:
+        if not self.wait_for_layout_stable:
+            return True
+        return driver.execute_async_script(LAYOUT_STABLE_SCRIPT, {
+            "checks": self.stable_checks,
+            "interval": int(self.stable_interval * 1000),
+            "timeout": int(self.layout_timeout * 1000),
+        })
@@ -1,8 +1,11 @@
 import os
 import shutil
+from batch import run_batch
 from blocks_parser import Parser
+from load_profile import LoadProfile
+from result_cache import ResultCache
+from streaming import StreamingParser
 import pandas as pd
-import traceback
 
 # изменить на True для сохранения фотографий блоков
 debug = True
@@ -10,34 +13,63 @@ debug = True
 firefox_path = r'C:\Program Files\Mozilla Firefox\firefox.exe'
 # ссылка на сайт для анализа
 website_url = "https://gb.ru"
+# изменить на True для анализа всех сайтов из urls.xlsx
+batch = False
+# количество одновременно работающих браузеров в режиме batch
+workers = 4
+# после скольких сайтов перезапускать браузер
+pages_per_driver = 50
+# ограничение времени загрузки сайта в секундах
+url_timeout = 120
+# сколько раз повторять анализ сайта после зависания или падения браузера
+retries = 2
+# файл для записи времени работы этапов парсера в режиме batch (None - не записывать)
+metrics_path = None
+# папка для кэша результатов, неизменившиеся сайты не анализируются повторно (None - без кэша)
+cache_dir = None
+# профиль загрузки страницы: LoadProfile() - полная загрузка, LoadProfile.lean() не ждет трекеры и видео
+# (LoadProfile.lean(viewport=(1920, 1080)) еще и задает размер окна, границы блоков при этом меняются)
+load_profile = LoadProfile()
+# формат хранения результатов в режиме batch: "parquet" или "arrow"
+output_format = "parquet"
+# изменить на True для упаковки результатов и фотографий блоков каждого сайта в sites/archives/<сайт>.zip
+archive = False
+# изменить на True для выгрузки всех результатов batch в sites/analysis.xlsx
+export_excel = False
+# размеры окна для анализа нескольких версий сайта за одну загрузку, например [(1920, 1080), (768, 1024), (375, 812)]
+# (None - только текущий размер окна)
+viewports = None
+# изменить на True для анализа сайта по частям при прокрутке (длинные страницы, меньше памяти)
+streaming = False
 
 if __name__ == "__main__":
     output_dir = os.path.dirname(os.path.realpath(__file__))
-    screenshot_dir = None
-    if debug:
+
+    if batch:
+        urls = pd.read_excel(output_dir + "/urls.xlsx")
+        sites_dir = os.path.join(output_dir, "sites")
+        run_batch(urls["urls"].tolist(), sites_dir, firefox_path=firefox_path,
+                  workers=workers, debug=debug, pages_per_driver=pages_per_driver, url_timeout=url_timeout,
+                  metrics_path=metrics_path, cache_dir=cache_dir,
+                  load_profile=load_profile, output_format=output_format,
+                  excel_path=os.path.join(sites_dir, "analysis.xlsx") if export_excel else None,
+                  viewports=viewports, retries=retries, archive=archive)
+    else:
         screenshot_dir = os.path.join(output_dir, "screenshots")
         if os.path.exists(screenshot_dir):
             shutil.rmtree(screenshot_dir)
         os.makedirs(screenshot_dir)
 
-    urls = pd.read_excel(output_dir + "/urls.xlsx")
-    parser = Parser(firefox_path=firefox_path, debug=debug, screenshot_path=screenshot_dir)
-    
-    # website_url: str = url["urls"]
-    print(website_url)
-    df = parser.parse(website_url)
-    df.to_excel(screenshot_dir + "/analysis.xlsx")
-    
-    # for i, url in urls.iterrows():
-    #     if os.path.exists(screenshot_dir):
-    #         shutil.rmtree(screenshot_dir)
-    #     os.makedirs(screenshot_dir)
-    #     try:
-    #         website_url: str = url["urls"]
-    #         print(website_url)
-    #         df = parser.parse(website_url)
-    #         df.to_excel(screenshot_dir + "/analysis.xlsx")
-    #         shutil.make_archive(output_dir + f'/{website_url.replace("https://", "")}', "zip", screenshot_dir)
-    #     except Exception:
-    #         print("                   Error: ", traceback.format_exc())
-    #         continue
\ No newline at end of file
+        if streaming:
+            parser = StreamingParser(firefox_path=firefox_path, debug=debug, screenshot_path=screenshot_dir,
+                                     load_profile=load_profile)
+        else:
+            cache = ResultCache(cache_dir) if cache_dir else None
+            parser = Parser(firefox_path=firefox_path, debug=debug, screenshot_path=screenshot_dir, cache=cache,
+                            load_profile=load_profile)
+        print(website_url)
+        df = parser.parse(website_url) if streaming else parser.parse(website_url, viewports=viewports)
+        df.to_excel(screenshot_dir + "/analysis.xlsx")
+        if debug:
+            print(parser.metrics.to_frame().T.to_string())
+        parser.close()
@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+
+
+class ParserMetrics:
+    def __init__(self, url: str = None):
+        self.url = url
+        self.stages = {}
+        self.commands = Counter()
+        self.elements = 0
+        self.current_stage: str = None
+        self.stage_started: float = None
+        # innermost stage an exception was raised in
+        self.failed_stage: str = None
+
+    @contextmanager
+    def stage(self, name: str):
+        outer = (self.current_stage, self.stage_started)
+        started = time.perf_counter()
+        self.current_stage, self.stage_started = name, started
+        try:
+            yield
+        except BaseException:
+            if self.failed_stage is None:
+                self.failed_stage = name
+            raise
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter() - started
+            self.current_stage, self.stage_started = outer
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        # time measured outside of this process, e.g. by a page script
+        self.stages[name] = self.stages.get(name, 0) + seconds
+
+    def count_command(self, command: str) -> None:
+        self.commands[command] += 1
+
+    def count_elements(self, number: int) -> None:
+        self.elements += number
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "stages": dict(self.stages),
+            "commands": dict(self.commands),
+            "commands_total": sum(self.commands.values()),
+            "elements": self.elements,
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        row = {"url": self.url, "commands_total": sum(self.commands.values()), "elements": self.elements}
+        row.update({f"stage_{name}": seconds for name, seconds in self.stages.items()})
+        row.update({f"command_{name}": number for name, number in self.commands.items()})
+        return pd.DataFrame([row])
+
+
+def timed(stage: str = None):
+    def decorator(method):
+        name = stage or method.__name__
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_driver_commands(driver, get_metrics) -> None:
+    # every WebDriver and WebElement command goes through driver.execute
+    execute = driver.execute
+
+    def counted(driver_command, params=None):
+        get_metrics().count_command(driver_command)
+        return execute(driver_command, params)
+    driver.execute = counted
+
+
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
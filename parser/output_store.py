@@ -0,0 +1,104 @@
+import glob
+import hashlib
+import os
+import re
+import shutil
+import uuid
+import zipfile
+from typing import List, Set
+
+import pandas as pd
+
+
+def site_name(url: str) -> str:
+    name = re.sub(r"^https?://", "", url).strip("/")
+    name = re.sub(r"[^\w.-]+", "_", name)
+    # different urls can clean up to the same name, a hash of the full url keeps them apart
+    return f"{name}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+class ResultStore:
+    # blocks/site=<name>/part-0.<format> plus a _SUCCESS marker holding the url,
+    # screenshots/<name>/ for the block images of each site and, with archive,
+    # archives/<name>.zip holding both
+    def __init__(self, root: str, format: str = "parquet", archive: bool = False):
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown format: {format}")
+        self.root = root
+        self.format = format
+        self.archive = archive
+        self.blocks_dir = os.path.join(root, "blocks")
+        self.screenshots_dir = os.path.join(root, "screenshots")
+        self.archives_dir = os.path.join(root, "archives")
+        os.makedirs(self.blocks_dir, exist_ok=True)
+        os.makedirs(self.screenshots_dir, exist_ok=True)
+        if archive:
+            os.makedirs(self.archives_dir, exist_ok=True)
+
+    def partition_path(self, url: str) -> str:
+        return os.path.join(self.blocks_dir, f"site={site_name(url)}")
+
+    def screenshot_dir(self, url: str) -> str:
+        path = os.path.join(self.screenshots_dir, site_name(url))
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        return path
+
+    def write_site(self, url: str, df: pd.DataFrame) -> str:
+        partition = self.partition_path(url)
+        os.makedirs(partition, exist_ok=True)
+        df = df.reset_index(drop=True)
+        df.insert(0, "url", url)
+
+        path = os.path.join(partition, f"part-0.{self.format}")
+        tmp = os.path.join(partition, f".{uuid.uuid4().hex}.tmp")
+        if self.format == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_feather(tmp)
+        os.replace(tmp, path)
+        if self.archive:
+            self.archive_site(url)
+        # the marker is written last, a crash before it leaves the site to be parsed again
+        with open(os.path.join(partition, "_SUCCESS"), "w", encoding="utf-8") as file:
+            file.write(url)
+        return path
+
+    def archive_site(self, url: str) -> str:
+        name = site_name(url)
+        path = os.path.join(self.archives_dir, f"{name}.zip")
+        tmp = os.path.join(self.archives_dir, f".{uuid.uuid4().hex}.tmp")
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for directory in (self.partition_path(url), os.path.join(self.screenshots_dir, name)):
+                for dirpath, _, filenames in os.walk(directory):
+                    for filename in filenames:
+                        file = os.path.join(dirpath, filename)
+                        archive.write(file, os.path.relpath(file, self.root))
+        os.replace(tmp, path)
+        return path
+
+    def completed_urls(self) -> Set[str]:
+        urls = set()
+        for marker in glob.glob(os.path.join(self.blocks_dir, "site=*", "_SUCCESS")):
+            with open(marker, encoding="utf-8") as file:
+                urls.add(file.read())
+        return urls
+
+    def is_done(self, url: str) -> bool:
+        return os.path.exists(os.path.join(self.partition_path(url), "_SUCCESS"))
+
+    def pending(self, urls: List[str]) -> List[str]:
+        completed = self.completed_urls()
+        return [url for url in urls if url not in completed]
+
+    def read_site(self, url: str) -> pd.DataFrame:
+        path = os.path.join(self.partition_path(url), f"part-0.{self.format}")
+        return pd.read_parquet(path) if self.format == "parquet" else pd.read_feather(path)
+
+    def read_all(self) -> pd.DataFrame:
+        frames = [self.read_site(url) for url in sorted(self.completed_urls())]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def export_excel(self, path: str) -> None:
+        self.read_all().to_excel(path, index=False)
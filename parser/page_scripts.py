@@ -0,0 +1,330 @@
+DOM_HELPERS = """
+const styles = new Map();
+const rects = new Map();
+const chains = new Map();
+
+function style(el) {
+    let value = styles.get(el);
+    if (value === undefined) {
+        value = getComputedStyle(el);
+        styles.set(el, value);
+    }
+    return value;
+}
+
+function rect(el) {
+    let value = rects.get(el);
+    if (value === undefined) {
+        const r = el.getBoundingClientRect();
+        value = {
+            x: Math.abs(r.left + window.scrollX),
+            y: Math.abs(r.top + window.scrollY),
+            width: r.width,
+            height: r.height
+        };
+        rects.set(el, value);
+    }
+    return value;
+}
+
+function renderedChain(el) {
+    if (!el || el.nodeType !== 1) {
+        return true;
+    }
+    let value = chains.get(el);
+    if (value === undefined) {
+        const s = style(el);
+        value = s.display !== "none" && s.opacity !== "0" && renderedChain(el.parentElement);
+        chains.set(el, value);
+    }
+    return value;
+}
+
+function isDisplayed(el) {
+    if (!renderedChain(el) || style(el).visibility !== "visible") {
+        return false;
+    }
+    const r = rect(el);
+    if (r.width > 0 && r.height > 0) {
+        return true;
+    }
+    for (const child of el.getElementsByTagName("*")) {
+        const c = rect(child);
+        if (c.width > 0 && c.height > 0) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// windowed passes skip what an earlier pass already returned and everything below window_bottom
+function seenSet(name, args) {
+    if (args.window_bottom === undefined || args.window_bottom === null) {
+        return null;
+    }
+    if (args.reset_seen || !window[name]) {
+        window[name] = new WeakMap();
+    }
+    return window[name];
+}
+
+function isTransparent(value) {
+    if (!value || value === "transparent") {
+        return true;
+    }
+    const match = /^rgba\\(.*,\\s*([\\d.]+)\\)$/.exec(value);
+    return match !== null && parseFloat(match[1]) === 0;
+}
+"""
+
+EXTRACT_ELEMENTS_SCRIPT = DOM_HELPERS + """
+const args = arguments[0];
+const mapsRegex = new RegExp(args.maps_regex);
+const imgClasses = ["img", "Image", "image", "Img"];
+const headTags = ["p", "div", "h1", "h2", "h3", "h4", "h5", "h6"];
+const blockTags = new Set(["div", "section", "main", "header", "footer", "a"]);
+
+const images = imgClasses.map(() => []);
+const imgTags = [];
+// a Map, tag names like "constructor" would hit Object.prototype on a plain object
+const heads = new Map(headTags.map(tag => [tag, []]));
+const buttons = [];
+const anchors = [];
+const forms = [];
+const maps = [];
+const mapFrames = [];
+const blocks = [];
+const sliders = [];
+
+// milliseconds spent on the document scan and on each element type
+const timings = {};
+function timed(name, run) {
+    const started = performance.now();
+    run();
+    timings[name] = (timings[name] || 0) + performance.now() - started;
+}
+
+const scanStarted = performance.now();
+for (const el of document.getElementsByTagName("*")) {
+    const tag = el.localName;
+    const cls = el.getAttribute("class") || "";
+    const id = el.getAttribute("id") || "";
+
+    if (tag === "img") {
+        imgTags.push(el);
+    }
+    if (tag === "div") {
+        imgClasses.forEach((name, i) => {
+            if (cls.includes(name)) {
+                images[i].push(el);
+            }
+        });
+    }
+    if (heads.has(tag)) {
+        heads.get(tag).push(el);
+    }
+    if (tag === "button" || (tag === "input" && (el.getAttribute("type") || "").includes("button"))) {
+        buttons.push(el);
+    }
+    if (tag === "a") {
+        anchors.push(el);
+    }
+    if (tag === "form" || (tag === "div" && (cls.includes("form") || id.includes("form")))) {
+        forms.push(el);
+    }
+    if (tag === "ymaps" || id.includes("map") || (tag === "div" && cls.includes("map"))) {
+        maps.push(el);
+    }
+    if (tag === "iframe" && el.src && mapsRegex.test(el.src)) {
+        mapFrames.push(el);
+    }
+    if (blockTags.has(tag)) {
+        blocks.push(el);
+    }
+    if (tag === "div" && cls.includes("slider")) {
+        sliders.push(el);
+    }
+}
+timings.scan = performance.now() - scanStarted;
+
+// one array per field, the column names are sent once instead of per element
+const columns = {type: [], x: [], y: [], width: [], height: [], text: [], background_color: [], font_size: [], tag: []};
+const seen = seenSet("__fiiSeenElements", args);
+const marked = [];
+
+function push(type, elements, extra) {
+    for (const el of elements) {
+        if (seen && seen.has(el) && seen.get(el).has(type)) {
+            continue;
+        }
+        if (!isDisplayed(el)) {
+            continue;
+        }
+        const r = rect(el);
+        if (seen) {
+            if (r.y >= args.window_bottom) {
+                continue;
+            }
+            marked.push([el, type]);
+        }
+        const row = {
+            type: type,
+            x: r.x,
+            y: r.y,
+            width: r.width,
+            height: r.height,
+            text: null,
+            background_color: null,
+            font_size: null,
+            tag: el.localName
+        };
+        if (extra) {
+            extra(el, row);
+        }
+        for (const key in columns) {
+            columns[key].push(row[key]);
+        }
+    }
+}
+
+const withText = (el, row) => row.text = (el.innerText || "").trim();
+const withColor = (el, row) => row.background_color = style(el).backgroundColor;
+
+timed("image", () => {
+    push("image", imgTags);
+    images.forEach(elements => push("image", elements));
+});
+timed("head_text", () => headTags.forEach(tag => push("head_text", heads.get(tag), (el, row) => {
+    withColor(el, row);
+    row.font_size = style(el).fontSize;
+})));
+timed("button", () => {
+    push("button", buttons, withText);
+    push("button", anchors.filter(el => !isTransparent(style(el).backgroundColor)), withText);
+});
+timed("link", () => push("link", anchors.filter(el => isTransparent(style(el).backgroundColor)), withText));
+timed("form", () => push("form", forms));
+timed("map", () => {
+    push("map", maps);
+    push("map", mapFrames);
+});
+
+timed("colored_block", () => {
+    // size and color are cheap, isDisplayed walks the ancestors
+    const colored = blocks
+        .filter(el => {
+            const r = rect(el);
+            return r.height >= args.min_block_height
+                && r.width >= args.min_block_width
+                && !isTransparent(style(el).backgroundColor);
+        })
+        .filter(isDisplayed)
+        .sort((a, b) => rect(a).y - rect(b).y);
+    push("colored_block", colored, withColor);
+});
+timed("slider", () => push("slider", sliders));
+
+for (const [el, type] of marked) {
+    if (!seen.has(el)) {
+        seen.set(el, new Set());
+    }
+    seen.get(el).add(type);
+}
+
+return {columns: columns, timings: timings};
+"""
+
+COLLECT_TEXT_SCRIPT = DOM_HELPERS + """
+const args = arguments[0] || {};
+const seen = seenSet("__fiiSeenTexts", args);
+const skipTags = new Set(["script", "style", "noscript", "iframe", "template"]);
+const fontTags = new Set(["p", "div", "h1", "h2", "h3", "h4", "h5", "table"]);
+const words = [];
+const fonts = [];
+
+const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_TEXT);
+for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    const parent = node.parentElement;
+    if (!parent || skipTags.has(parent.localName) || parent.closest("script, iframe")) {
+        continue;
+    }
+    const text = node.textContent.trim();
+    if (!text || (seen && seen.has(node)) || !isDisplayed(parent)) {
+        continue;
+    }
+    const y = rect(parent).y;
+    if (seen) {
+        if (y >= args.window_bottom) {
+            continue;
+        }
+        seen.set(node, true);
+    }
+    words.push([y, text.split(/\\s+/).length]);
+}
+
+for (const el of document.getElementsByTagName("*")) {
+    if (!fontTags.has(el.localName) || (seen && seen.has(el)) || !isDisplayed(el)) {
+        continue;
+    }
+    const y = rect(el).y;
+    if (seen) {
+        if (y >= args.window_bottom) {
+            continue;
+        }
+        seen.set(el, true);
+    }
+    fonts.push([y, style(el).fontSize]);
+}
+
+return {words: words, fonts: fonts};
+"""
+
+LAYOUT_STABLE_SCRIPT = """
+const args = arguments[0];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+let last = null;
+let stable = 0;
+
+function layoutState() {
+    const body = document.body;
+    if (!body || document.readyState === "loading") {
+        return null;
+    }
+    // images without size change the geometry, lazy ones are loaded on scroll anyway
+    const imagesReady = Array.from(document.images).every(img => img.complete || img.loading === "lazy");
+    if (!imagesReady) {
+        return null;
+    }
+    return [body.scrollWidth, body.scrollHeight, document.getElementsByTagName("*").length].join();
+}
+
+function tick() {
+    const state = layoutState();
+    stable = state !== null && state === last ? stable + 1 : 0;
+    last = state;
+    if (stable >= args.checks || Date.now() - started > args.timeout) {
+        done(stable >= args.checks);
+    } else {
+        setTimeout(tick, args.interval);
+    }
+}
+
+(document.fonts ? document.fonts.ready : Promise.resolve()).then(tick, tick);
+"""
+
+PAGE_SIZE_SCRIPT = """
+const r = document.body.getBoundingClientRect();
+return [r.width, r.height];
+"""
+
+SCROLL_WINDOW_SCRIPT = """
+window.scrollTo(0, arguments[0]);
+const body = document.body.getBoundingClientRect();
+return {
+    scroll_y: window.scrollY,
+    viewport_height: window.innerHeight,
+    page_width: body.width,
+    page_height: body.height
+};
+"""
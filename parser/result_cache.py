@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import List
+
+import pandas as pd
+
+from element_table import ElementTable
+
+
+class ResultCache:
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(url: str, elements_data: ElementTable, text_data: dict, config: dict) -> str:
+        digest = hashlib.sha256()
+        digest.update(url.encode("utf-8"))
+        digest.update(elements_data.fingerprint())
+        digest.update(json.dumps(text_data, sort_keys=True).encode("utf-8"))
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str, screenshot_path: str = None) -> pd.DataFrame:
+        entry = self.entry_path(key)
+        try:
+            df = pd.read_pickle(os.path.join(entry, "analysis.pkl"))
+            if screenshot_path:
+                for name in os.listdir(os.path.join(entry, "screenshots")):
+                    shutil.copy(os.path.join(entry, "screenshots", name), screenshot_path)
+            # the meta file mtime is the last access time used for eviction
+            os.utime(os.path.join(entry, "meta.json"))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return df
+
+    def put(self, key: str, url: str, df: pd.DataFrame, screenshot_files: List[str] = ()) -> None:
+        entry = self.entry_path(key)
+        tmp = os.path.join(self.directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(os.path.join(tmp, "screenshots"))
+        df.to_pickle(os.path.join(tmp, "analysis.pkl"))
+        size = os.path.getsize(os.path.join(tmp, "analysis.pkl"))
+        for path in screenshot_files:
+            size += os.path.getsize(shutil.copy(path, os.path.join(tmp, "screenshots")))
+        # the size is recorded so that eviction does not have to walk every entry
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump({"url": url, "created": time.time(), "size": size}, file)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # another worker stored the same result first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def entries(self) -> List[str]:
+        return [name for name in os.listdir(self.directory) if not name.startswith(".")]
+
+    def entry_size(self, key: str) -> int:
+        size = 0
+        for root, _, files in os.walk(self.entry_path(key)):
+            size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return size
+
+    def evict(self) -> None:
+        entries = []
+        for key in self.entries():
+            meta = os.path.join(self.entry_path(key), "meta.json")
+            try:
+                accessed = os.path.getmtime(meta)
+                with open(meta, encoding="utf-8") as file:
+                    size = json.load(file).get("size")
+                if size is None:
+                    # stored before sizes were recorded
+                    size = self.entry_size(key)
+            except (OSError, ValueError):
+                continue
+            entries.append((accessed, key, size))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
+            total -= size
+
+    def invalidate(self, url: str = None, key: str = None) -> int:
+        removed = 0
+        for entry_key in self.entries():
+            if key is not None and entry_key != key:
+                continue
+            if url is not None:
+                try:
+                    with open(os.path.join(self.entry_path(entry_key), "meta.json"), encoding="utf-8") as file:
+                        if json.load(file)["url"] != url:
+                            continue
+                except (OSError, ValueError):
+                    continue
+            shutil.rmtree(self.entry_path(entry_key), ignore_errors=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self.invalidate()
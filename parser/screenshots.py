@@ -0,0 +1,51 @@
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+
+class ScreenshotPipeline:
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.pixels: np.ndarray = None
+        self.pending: List[Future] = []
+
+    def load(self, png: bytes) -> None:
+        self.wait()
+        self.pixels = None
+        if png is None:
+            return
+        with Image.open(io.BytesIO(png)) as image:
+            image.load()
+            self.pixels = np.asarray(image)
+
+    def crop(self, x: float, y: float, width: float, height: float) -> np.ndarray:
+        # slicing keeps a view into the decoded page, no pixels are copied
+        rows, cols = self.pixels.shape[:2]
+        left = min(max(int(round(x)), 0), cols)
+        top = min(max(int(round(y)), 0), rows)
+        right = min(max(int(round(x + width)), left), cols)
+        bottom = min(max(int(round(y + height)), top), rows)
+        return self.pixels[top:bottom, left:right]
+
+    def save(self, path: str, x: float, y: float, width: float, height: float) -> None:
+        self.save_pixels(path, self.crop(x, y, width, height))
+
+    def save_pixels(self, path: str, pixels: np.ndarray) -> None:
+        self.pending.append(self.executor.submit(self.write, path, pixels))
+
+    @staticmethod
+    def write(path: str, pixels: np.ndarray) -> None:
+        Image.fromarray(pixels).save(path)
+
+    def wait(self) -> None:
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        self.wait()
+        self.executor.shutdown()
+        self.pixels = None
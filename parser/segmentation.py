@@ -0,0 +1,82 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+HEAD_TEXT = 0
+COLORED_BLOCK = 1
+NO_COLOR = -1
+
+
+def select_semantic_rows(y: np.ndarray) -> np.ndarray:
+    # rows sorted by y, dropping every y that is shared by several rows
+    order = np.argsort(y, kind="stable")
+    _, counts = np.unique(y[order], return_counts=True)
+    return order[np.repeat(counts == 1, counts)]
+
+
+class Segmenter:
+    # merges semantic rows sorted by y into (y_begin, y_end, color) blocks,
+    # NO_COLOR never equals another color like the NaN colors of the groupby it replaces.
+    # Rows can be pushed in chunks, a row is processed once the row after it is known.
+    def __init__(self, min_block_height: float):
+        self.min_block_height = min_block_height
+        self.index = 0
+        self.pending: List[Tuple[float, float, float, int, int]] = []
+        self.accum_y: float = None
+        self.accum_color = NO_COLOR
+        self.accum_count = 1
+
+    def push(self, y: float, x: float, height: float, type: int, color: int) -> List[Tuple[float, float, int]]:
+        if self.accum_y is None:
+            self.accum_y = y
+            self.accum_color = color
+        self.pending.append((y, x, height, type, color))
+        blocks = []
+        while len(self.pending) > 1:
+            self.step(self.pending[0], self.pending[1], False, blocks)
+            self.pending.pop(0)
+        return blocks
+
+    def finish(self, page_height: float) -> List[Tuple[float, float, int]]:
+        blocks = []
+        if self.pending:
+            self.step(self.pending[0], (page_height, 0, 0, COLORED_BLOCK, NO_COLOR), True, blocks)
+            self.pending = []
+        return blocks
+
+    def step(self, current: tuple, next: tuple, last: bool, blocks: list) -> None:
+        i = self.index
+        self.index += 1
+        _, current_x, current_height, current_type, current_color = current
+        next_y, next_x, _, next_type, next_color = next
+        both_colored = current_type == COLORED_BLOCK and next_type == COLORED_BLOCK
+
+        if not both_colored and current_x < next_x and i >= 2:
+            return
+        if next_y - self.accum_y < self.min_block_height:
+            return
+
+        accum_height = next_y - self.accum_y
+        if current_color == next_color and current_color != NO_COLOR and not last \
+                and not (current_type == HEAD_TEXT and next_type == HEAD_TEXT):
+            self.accum_count += 1
+            self.accum_color = current_color
+            return
+
+        if self.accum_count < 2 and accum_height > current_height and both_colored:
+            blocks.append((self.accum_y, self.accum_y + current_height, current_color))
+            blocks.append((self.accum_y + current_height, self.accum_y + accum_height, self.accum_color))
+        else:
+            blocks.append((self.accum_y, self.accum_y + accum_height, self.accum_color))
+        self.accum_y = next_y
+        self.accum_count = 1
+
+
+def segment_blocks(y: np.ndarray, x: np.ndarray, height: np.ndarray, types: np.ndarray, colors: np.ndarray,
+                   page_height: float, min_block_height: float) -> List[Tuple[float, float, int]]:
+    segmenter = Segmenter(min_block_height)
+    blocks = []
+    for row in zip(y.tolist(), x.tolist(), height.tolist(), types.tolist(), colors.tolist()):
+        blocks += segmenter.push(*row)
+    return blocks + segmenter.finish(page_height)
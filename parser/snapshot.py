@@ -0,0 +1,101 @@
+import json
+import zipfile
+from typing import Dict, List, Tuple, Union
+
+import pandas as pd
+
+from blocks_parser import Parser
+from metrics import timed
+
+
+ELEMENT_COLUMNS = ["type", "x", "y", "width", "height", "text", "background_color", "font_size", "tag"]
+
+
+class PageSnapshot:
+    def __init__(self, url: str, page_width: float, page_height: float,
+                 elements: Dict[str, list], texts: dict, screenshot: bytes = None):
+        self.url = url
+        self.page_width = page_width
+        self.page_height = page_height
+        self.elements = elements
+        self.texts = texts
+        self.screenshot = screenshot
+
+    def save(self, path: str) -> None:
+        layout = {
+            "url": self.url,
+            "page_width": self.page_width,
+            "page_height": self.page_height,
+            "elements": {column: self.elements[column] for column in ELEMENT_COLUMNS},
+            "texts": self.texts,
+        }
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("layout.json", json.dumps(layout, ensure_ascii=False, separators=(",", ":")))
+            if self.screenshot is not None:
+                # png is already compressed
+                archive.writestr("screenshot.png", self.screenshot, compress_type=zipfile.ZIP_STORED)
+
+    @classmethod
+    def load(cls, path: str) -> "PageSnapshot":
+        with zipfile.ZipFile(path) as archive:
+            layout = json.loads(archive.read("layout.json"))
+            screenshot = archive.read("screenshot.png") if "screenshot.png" in archive.namelist() else None
+        return cls(layout["url"], layout["page_width"], layout["page_height"], layout["elements"], layout["texts"],
+                   screenshot)
+
+
+def capture_snapshot(parser: Parser, url: str, screenshot: bool = True) -> PageSnapshot:
+    parser.load_page(url)
+    # thresholds are left open so that they can be tuned on replay
+    return PageSnapshot(
+        url=url,
+        page_width=parser.get_page_width(),
+        page_height=parser.get_page_height(),
+        elements=parser.collect_element_columns(0, 0),
+        texts=parser.collect_text_data(),
+        screenshot=parser.get_full_page_screenshot() if screenshot else None,
+    )
+
+
+class SnapshotParser(Parser):
+    def create_driver(self, firefox_path: str) -> None:
+        self.snapshot: PageSnapshot = None
+        self.preloaded: PageSnapshot = None
+        return None
+
+    def close(self) -> None:
+        self.screenshots.close()
+
+    def parse(self, url: Union[str, PageSnapshot], viewports: List[Tuple[int, int]] = None) -> pd.DataFrame:
+        if not isinstance(url, PageSnapshot):
+            return super().parse(url, viewports)
+        # metrics, the cache key and the results get the page url, load_page gets the object
+        self.preloaded = url
+        try:
+            return super().parse(url.url, viewports)
+        finally:
+            self.preloaded = None
+
+    @timed()
+    def load_page(self, url: Union[str, PageSnapshot]) -> None:
+        if isinstance(url, PageSnapshot):
+            self.snapshot = url
+        elif self.preloaded is not None:
+            self.snapshot = self.preloaded
+        else:
+            self.snapshot = PageSnapshot.load(url)
+
+    def get_page_height(self) -> float:
+        return self.snapshot.page_height
+
+    def get_page_width(self) -> float:
+        return self.snapshot.page_width
+
+    def collect_element_columns(self, min_block_height: float, min_block_width: float, **window) -> dict:
+        return self.snapshot.elements
+
+    def collect_text_data(self) -> dict:
+        return self.snapshot.texts
+
+    def get_full_page_screenshot(self) -> bytes:
+        return self.snapshot.screenshot
@@ -0,0 +1,177 @@
+import io
+import time
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from blocks_parser import Parser
+from element_table import TYPE_CODES, ElementTable
+from elements_index import ElementsIndex
+from metrics import ParserMetrics, timed
+from page_scripts import COLLECT_TEXT_SCRIPT, SCROLL_WINDOW_SCRIPT
+from segmentation import COLORED_BLOCK, HEAD_TEXT, NO_COLOR, Segmenter, select_semantic_rows
+from text_table import TextTable
+
+
+# bottom of the last window, JSON has no infinity
+PAGE_END = 1e12
+
+
+class StreamingParser(Parser):
+    # Scrolls the page window by window, only elements above the bottom of the scanned
+    # windows are collected and blocks are emitted as soon as their end is known.
+    # Head texts are chosen against the largest font seen so far instead of the page maximum.
+    def __init__(self, *args, scroll_pause: float = 0.3, max_windows: int = 500, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scroll_pause = scroll_pause
+        self.max_windows = max_windows
+
+    def parse(self, url: str) -> pd.DataFrame:
+        frames = list(self.iter_blocks(url))
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        self.text_table = TextTable([], [], [], [])
+        return self.collect_blocks_data(ElementsIndex(self.elements), [])
+
+    def iter_blocks(self, url: str) -> Iterator[pd.DataFrame]:
+        self.metrics = ParserMetrics(url)
+        self.screenshot_files = []
+        self.load_page(url)
+
+        self.segmenter = Segmenter(self.min_block_height)
+        self.color_codes = {}
+        self.color_names = []
+        self.max_head_font_size = 0
+        self.last_semantic_y = -1.0
+        self.words: List[Tuple[float, int]] = []
+        self.fonts: List[Tuple[float, int]] = []
+        self.tiles: List[Tuple[float, np.ndarray]] = []
+
+        top = 0
+        for window in range(self.max_windows):
+            state = self.scroll_to(top)
+            if window == 0:
+                self.page_width = state["page_width"]
+                self.min_block_width = self.min_block_width_ratio * self.page_width
+                self.elements = self.page_start_elements()
+                self.semantic = self.elements
+            self.page_height = state["page_height"]
+
+            bottom = state["scroll_y"] + state["viewport_height"]
+            last = bottom >= self.page_height or window == self.max_windows - 1
+            window_bottom = PAGE_END if last else bottom
+
+            self.collect_window(window_bottom, reset=window == 0)
+            if self.debug:
+                self.collect_tile(state["scroll_y"])
+
+            with self.metrics.stage("segment"):
+                bounds = self.feed_semantic(window_bottom)
+                if last:
+                    bounds += self.segmenter.finish(self.page_height)
+            if bounds:
+                yield self.finalize(bounds)
+            self.prune()
+
+            if last:
+                break
+            top = bottom
+
+        with self.metrics.stage("screenshot_writes"):
+            self.screenshots.wait()
+
+    @timed()
+    def scroll_to(self, top: float) -> dict:
+        self.driver.execute_script(SCROLL_WINDOW_SCRIPT, top)
+        # lazy content is loaded once the window is in view
+        time.sleep(self.scroll_pause)
+        return self.driver.execute_script(SCROLL_WINDOW_SCRIPT, top)
+
+    @timed()
+    def collect_window(self, window_bottom: float, reset: bool) -> None:
+        window = {"window_bottom": window_bottom, "reset_seen": reset}
+        columns = self.collect_element_columns(self.min_block_height, self.min_block_width, **window)
+        texts = self.driver.execute_script(COLLECT_TEXT_SCRIPT, window)
+
+        head_font_sizes = [self.parse_font_size(font_size)
+                           for type, font_size in zip(columns["type"], columns["font_size"]) if type == "head_text"]
+        self.max_head_font_size = max(head_font_sizes + [self.max_head_font_size])
+        chunk = self.build_elements_data(columns, self.max_head_font_size, with_page_start=False)
+        self.metrics.count_elements(len(chunk))
+
+        self.elements = ElementTable.concat([self.elements, chunk])
+        self.semantic = ElementTable.concat([self.semantic, chunk.take(chunk.type_mask("head_text", "colored_block"))])
+        self.words += [(word[0], word[1]) for word in texts["words"]]
+        self.fonts += [(font[0], self.parse_font_size(font[1])) for font in texts["fonts"]]
+
+    @timed()
+    def collect_tile(self, scroll_y: float) -> None:
+        with Image.open(io.BytesIO(self.driver.get_screenshot_as_png())) as image:
+            image.load()
+            self.tiles.append((scroll_y, np.asarray(image)))
+
+    def color_code(self, color: str) -> int:
+        if color is None:
+            return NO_COLOR
+        if color not in self.color_codes:
+            self.color_codes[color] = len(self.color_names)
+            self.color_names.append(color)
+        return self.color_codes[color]
+
+    def feed_semantic(self, frontier: float) -> List[Tuple[float, float, int]]:
+        # every row above the frontier is known, so duplicates among them can be dropped for good
+        ready = self.semantic.y < frontier
+        rows = self.semantic.take(ready)
+        self.semantic = self.semantic.take(~ready)
+        rows = rows.take(select_semantic_rows(rows.y))
+
+        bounds = []
+        for y, x, height, type, color in zip(rows.y.tolist(), rows.x.tolist(), rows.height.tolist(),
+                                             rows.types.tolist(), rows.color_values().tolist()):
+            if y <= self.last_semantic_y:
+                # appeared above an already segmented part of the page
+                continue
+            self.last_semantic_y = y
+            type_code = COLORED_BLOCK if type == TYPE_CODES["colored_block"] else HEAD_TEXT
+            bounds += self.segmenter.push(y, x, height, type_code, self.color_code(color))
+        return bounds
+
+    def finalize(self, bounds: List[Tuple[float, float, int]]) -> pd.DataFrame:
+        blocks = [(0, y_begin, self.page_width, y_end, self.color_names[color] if color != NO_COLOR else None)
+                  for y_begin, y_end, color in bounds]
+        with self.metrics.stage("elements_index"):
+            elements_index = ElementsIndex(self.elements)
+            self.text_table = TextTable([word[0] for word in self.words], [word[1] for word in self.words],
+                                        [font[0] for font in self.fonts], [font[1] for font in self.fonts])
+        return self.collect_blocks_data(elements_index, blocks)
+
+    def prune(self) -> None:
+        # nothing above the start of the open block is needed anymore
+        start = self.segmenter.accum_y
+        if start is None:
+            return
+        self.elements = self.elements.take(self.elements.y >= start)
+        self.words = [word for word in self.words if word[0] >= start]
+        self.fonts = [font for font in self.fonts if font[0] >= start]
+        self.tiles = [tile for tile in self.tiles if tile[0] + tile[1].shape[0] > start]
+
+    def can_take_screenshots(self) -> bool:
+        return bool(self.tiles)
+
+    def take_screenshot(self, path: str, x: float, y: float, width: float, height: float) -> None:
+        y_end = min(y + height, self.page_height)
+        left, right = int(round(x)), int(round(x + width))
+        parts = []
+        cursor = y
+        for top, pixels in self.tiles:
+            bottom = top + pixels.shape[0]
+            if bottom <= cursor or top >= y_end:
+                continue
+            start, stop = max(cursor, top), min(y_end, bottom)
+            parts.append(pixels[int(round(start - top)):int(round(stop - top)), left:right])
+            cursor = stop
+        if parts:
+            self.screenshots.save_pixels(path, np.concatenate(parts) if len(parts) > 1 else parts[0])
+            self.screenshot_files.append(path)
@@ -0,0 +1,143 @@
+import os
+import signal
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List
+
+import pandas as pd
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+from blocks_parser import Parser
+
+
+KILL_SIGNAL = getattr(signal, "SIGKILL", signal.SIGTERM)
+# a hung or killed browser surfaces as one of these in the thread that waits for it
+RETRY_ERRORS = (WebDriverException, OSError, HTTPError)
+
+
+class ParseFailed(Exception):
+    def __init__(self, url: str, failures: List[dict]):
+        last = failures[-1]
+        super().__init__(f"{url} failed after {len(failures)} attempts, "
+                         f"last in stage {last['stage']}: {last['error']}")
+        self.url = url
+        self.failures = failures
+
+
+class ParserSupervisor:
+    # runs every url under a watchdog: a url over parse_timeout or a stage over its entry in
+    # stage_timeouts gets the browser killed, then the url is retried in a fresh one with backoff
+    def __init__(self, make_parser: Callable[[], Parser], parse_timeout: float = 300,
+                 stage_timeouts: Dict[str, float] = None, retries: int = 2, backoff: float = 2,
+                 max_backoff: float = 60, pages_per_parser: int = 50, poll_interval: float = 0.5):
+        self.make_parser = make_parser
+        self.parse_timeout = parse_timeout
+        self.stage_timeouts = stage_timeouts or {}
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pages_per_parser = pages_per_parser
+        self.poll_interval = poll_interval
+        self.parser: Parser = None
+        self.pages = 0
+        self.timeout: dict = None
+        self.last_metrics: dict = None
+        self.lock = threading.Lock()
+
+    def get_parser(self) -> Parser:
+        if self.parser is not None and self.pages >= self.pages_per_parser:
+            self.close()
+        if self.parser is None:
+            self.parser = self.make_parser()
+            self.pages = 0
+        return self.parser
+
+    def close(self) -> None:
+        if self.parser is not None:
+            try:
+                self.parser.close()
+            except Exception:
+                pass
+        self.parser = None
+
+    def kill(self) -> None:
+        # quit() talks to the hung browser, the processes are killed instead
+        parser, self.parser = self.parser, None
+        if parser is None:
+            return
+        driver = parser.driver
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        pids = [getattr(driver, "capabilities", {}).get("moz:processID"), process.pid if process else None]
+        for pid in pids:
+            if pid:
+                try:
+                    os.kill(pid, KILL_SIGNAL)
+                except OSError:
+                    pass
+        parser.screenshots.close()
+
+    def watch(self, parser: Parser, done: threading.Event) -> None:
+        deadline = time.perf_counter() + self.parse_timeout
+        while not done.wait(self.poll_interval):
+            now = time.perf_counter()
+            stage, started = parser.metrics.current_stage, parser.metrics.stage_started
+            limit = self.stage_timeouts.get(stage)
+            if now > deadline:
+                timeout = {"stage": stage, "limit": "parse_timeout"}
+            elif limit is not None and started is not None and now - started > limit:
+                timeout = {"stage": stage, "limit": f"stage_timeouts[{stage!r}]"}
+            else:
+                continue
+            with self.lock:
+                if not done.is_set():
+                    self.timeout = timeout
+                    self.kill()
+            return
+
+    def parse(self, url: str, screenshot_path: str = None, **parse_kwargs) -> pd.DataFrame:
+        failures = []
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(min(self.backoff * 2 ** (attempt - 1), self.max_backoff))
+            parser = self.get_parser()
+            if screenshot_path is not None:
+                parser.screenshot_path = screenshot_path
+            self.pages += 1
+            self.timeout = None
+            done = threading.Event()
+            watchdog = threading.Thread(target=self.watch, args=(parser, done), daemon=True)
+            started = time.perf_counter()
+            watchdog.start()
+            try:
+                df = parser.parse(url, **parse_kwargs)
+            except Exception as error:
+                with self.lock:
+                    done.set()
+                failures.append(self.failure(url, attempt, parser, error, time.perf_counter() - started))
+                if self.timeout is None and not isinstance(error, RETRY_ERRORS):
+                    raise ParseFailed(url, failures) from error
+                if self.parser is parser:
+                    # the browser is in an unknown state after a driver error
+                    self.kill()
+                continue
+            finally:
+                done.set()
+                watchdog.join()
+                self.last_metrics = parser.metrics.to_dict()
+            # a kill right after the page was done leaves the result complete
+            return df
+        raise ParseFailed(url, failures)
+
+    def failure(self, url: str, attempt: int, parser: Parser, error: Exception, elapsed: float) -> dict:
+        timeout = self.timeout or {}
+        return {
+            "url": url,
+            "attempt": attempt,
+            "stage": timeout.get("stage") or parser.metrics.failed_stage,
+            "timeout": timeout.get("limit"),
+            "elapsed": elapsed,
+            "error": "".join(traceback.format_exception_only(type(error), error)).strip(),
+        }
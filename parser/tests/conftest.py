@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the parser modules are imported flatly, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
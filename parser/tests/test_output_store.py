@@ -0,0 +1,81 @@
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from output_store import ResultStore, site_name
+
+
+def blocks(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({
+        "y": [float(i * 100) for i in range(rows)],
+        "height": [100.0] * rows,
+        "background_color": ["#ffffff", None, "#000000"][:rows],
+        "contains_map": [False, True, False][:rows],
+    })
+
+
+def test_site_name_keeps_colliding_urls_apart():
+    assert site_name("https://a.ru/x?y") != site_name("https://a.ru/x_y")
+    assert site_name("https://a.ru/x?y").startswith("a.ru_x_y-")
+    assert site_name("https://a.ru/x?y") == site_name("https://a.ru/x?y")
+
+
+def test_colliding_urls_get_their_own_partitions(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.write_site("https://a.ru/x?y", blocks(1))
+    store.write_site("https://a.ru/x_y", blocks(2))
+    assert len(store.read_site("https://a.ru/x?y")) == 1
+    assert len(store.read_site("https://a.ru/x_y")) == 2
+    assert store.completed_urls() == {"https://a.ru/x?y", "https://a.ru/x_y"}
+
+
+def test_pending_skips_completed_urls(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.write_site("https://a.ru", blocks())
+    # a partition without its _SUCCESS marker was interrupted and is parsed again
+    os.makedirs(store.partition_path("https://b.ru"))
+    assert store.is_done("https://a.ru")
+    assert not store.is_done("https://b.ru")
+    assert store.pending(["https://a.ru", "https://b.ru", "https://c.ru"]) == ["https://b.ru", "https://c.ru"]
+    assert ResultStore(str(tmp_path)).pending(["https://a.ru"]) == []
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_write_read_round_trip(tmp_path, format):
+    store = ResultStore(str(tmp_path), format)
+    path = store.write_site("https://a.ru/x?y", blocks())
+    assert path == os.path.join(store.partition_path("https://a.ru/x?y"), f"part-0.{format}")
+    assert sorted(os.listdir(store.partition_path("https://a.ru/x?y"))) == ["_SUCCESS", f"part-0.{format}"]
+
+    expected = blocks()
+    expected.insert(0, "url", "https://a.ru/x?y")
+    pd.testing.assert_frame_equal(store.read_site("https://a.ru/x?y"), expected)
+    store.write_site("https://b.ru", blocks(1))
+    assert store.read_all()["url"].tolist() == ["https://a.ru/x?y"] * 3 + ["https://b.ru"]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        ResultStore(str(tmp_path), "csv")
+
+
+def test_archive_holds_partition_and_screenshots(tmp_path):
+    url = "https://a.ru/x?y"
+    store = ResultStore(str(tmp_path), archive=True)
+    screenshots = store.screenshot_dir(url)
+    os.makedirs(os.path.join(screenshots, "1920x1080"))
+    for name in ("0-100.png", os.path.join("1920x1080", "100-200.png")):
+        with open(os.path.join(screenshots, name), "wb") as file:
+            file.write(b"png")
+    store.write_site(url, blocks())
+
+    name = site_name(url)
+    with zipfile.ZipFile(os.path.join(store.archives_dir, f"{name}.zip")) as archive:
+        assert sorted(archive.namelist()) == [
+            f"blocks/site={name}/part-0.parquet",
+            f"screenshots/{name}/0-100.png",
+            f"screenshots/{name}/1920x1080/100-200.png",
+        ]
+    assert not os.path.exists(ResultStore(str(tmp_path / "plain")).archives_dir)
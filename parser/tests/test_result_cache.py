@@ -0,0 +1,119 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from element_table import TYPE_CODES, ElementTable
+from result_cache import ResultCache
+
+
+CONFIG = {"min_block_height": 30, "min_block_width_ratio": 0.7, "debug": False}
+TEXTS = {"words": [[10, 3]], "fonts": [[10, "16px"]]}
+
+
+def elements() -> ElementTable:
+    return ElementTable([TYPE_CODES["head_text"], TYPE_CODES["button"]], [0, 10], [0, 40], [1280, 100], [30, 20],
+                        [-1, 0], [-1, -1], ["Buy"])
+
+
+def frame(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({"y": [float(i * 100) for i in range(rows)], "background_color": ["#ffffff"] * rows})
+
+
+def meta_path(cache: ResultCache, key: str) -> str:
+    return os.path.join(cache.entry_path(key), "meta.json")
+
+
+def read_meta(cache: ResultCache, key: str) -> dict:
+    with open(meta_path(cache, key), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def set_accessed(cache: ResultCache, key: str, timestamp: float) -> None:
+    os.utime(meta_path(cache, key), (timestamp, timestamp))
+
+
+@pytest.fixture
+def screenshot(tmp_path) -> str:
+    path = tmp_path / "0-100.png"
+    path.write_bytes(b"\x89PNG" + b"\x00" * 1000)
+    return str(path)
+
+
+def test_hit_after_put(tmp_path, screenshot):
+    cache = ResultCache(str(tmp_path / "cache"))
+    key = cache.make_key("https://a.ru", elements(), TEXTS, CONFIG)
+    assert cache.get(key) is None
+    cache.put(key, "https://a.ru", frame(), [screenshot])
+
+    restored = tmp_path / "restored"
+    restored.mkdir()
+    pd.testing.assert_frame_equal(cache.get(key, str(restored)), frame())
+    assert os.listdir(restored) == ["0-100.png"]
+    assert read_meta(cache, key)["size"] == cache.entry_size(key) - os.path.getsize(meta_path(cache, key))
+
+
+def test_miss_when_inputs_change(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.make_key("https://a.ru", elements(), TEXTS, CONFIG)
+    cache.put(key, "https://a.ru", frame())
+
+    changed = [
+        cache.make_key("https://a.ru", elements(), TEXTS, dict(CONFIG, min_block_height=40)),
+        cache.make_key("https://b.ru", elements(), TEXTS, CONFIG),
+        cache.make_key("https://a.ru", elements().take([0]), TEXTS, CONFIG),
+        cache.make_key("https://a.ru", elements(), {"words": [[10, 4]], "fonts": TEXTS["fonts"]}, CONFIG),
+    ]
+    assert key not in changed
+    assert all(cache.get(other) is None for other in changed)
+    assert cache.make_key("https://a.ru", elements(), TEXTS, dict(reversed(CONFIG.items()))) == key
+
+
+def test_evict_least_recently_read_first(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("a", "https://a.ru", frame())
+    size = read_meta(cache, "a")["size"]
+    cache.max_bytes = 2 * size
+    cache.put("b", "https://b.ru", frame())
+    set_accessed(cache, "a", 1000)
+    set_accessed(cache, "b", 2000)
+
+    # reading "a" makes "b" the least recently read entry
+    assert cache.get("a") is not None
+    cache.put("c", "https://c.ru", frame())
+    assert sorted(cache.entries()) == ["a", "c"]
+
+    set_accessed(cache, "a", 3000)
+    set_accessed(cache, "c", 4000)
+    cache.put("d", "https://d.ru", frame())
+    assert sorted(cache.entries()) == ["c", "d"]
+
+
+def test_evict_entries_without_recorded_size(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("old", "https://old.ru", frame(2000))
+    meta = read_meta(cache, "old")
+    del meta["size"]
+    with open(meta_path(cache, "old"), "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+    set_accessed(cache, "old", 1000)
+
+    # the old entry is measured on disk and is the only one over the limit
+    cache.max_bytes = cache.entry_size("old") - 1
+    cache.put("new", "https://new.ru", frame())
+    assert cache.entries() == ["new"]
+
+
+def test_invalidate(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("a1", "https://a.ru", frame())
+    cache.put("a2", "https://a.ru", frame(4))
+    cache.put("b", "https://b.ru", frame())
+
+    assert cache.invalidate(url="https://a.ru") == 2
+    assert cache.entries() == ["b"]
+    assert cache.invalidate(key="missing") == 0
+    assert cache.invalidate(key="b") == 1
+    assert cache.entries() == []
+    assert cache.get("b") is None
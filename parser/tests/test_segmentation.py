@@ -0,0 +1,203 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from element_table import TYPE_CODES
+from page_scripts import COLLECT_TEXT_SCRIPT, EXTRACT_ELEMENTS_SCRIPT, SCROLL_WINDOW_SCRIPT
+from segmentation import COLORED_BLOCK, HEAD_TEXT, Segmenter, segment_blocks, select_semantic_rows
+from snapshot import PageSnapshot, SnapshotParser
+from streaming import StreamingParser
+
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures")
+SNAPSHOTS = sorted(name[:-len(".zip")] for name in os.listdir(fixtures_dir) if name.endswith(".zip"))
+MIN_BLOCK_HEIGHT = 30
+VIEWPORT_HEIGHTS = [200, 500, 768, 5000]
+
+
+def snapshot_path(name: str) -> str:
+    return os.path.join(fixtures_dir, f"{name}.zip")
+
+
+def semantic_rows(name: str):
+    # the rows Parser.segment() hands to segment_blocks(), sorted by y and with shared ys dropped
+    parser = SnapshotParser(min_block_height=MIN_BLOCK_HEIGHT)
+    try:
+        parser.load_page(snapshot_path(name))
+        parser.page_width = parser.get_page_width()
+        parser.page_height = parser.get_page_height()
+        parser.min_block_width = parser.min_block_width_ratio * parser.page_width
+        elements = parser.collect_elements_data()
+    finally:
+        parser.close()
+    rows = elements.take(elements.type_mask("head_text", "colored_block"))
+    types = np.where(rows.types == TYPE_CODES["colored_block"], COLORED_BLOCK, HEAD_TEXT)
+    return rows.y, rows.x.astype(float), rows.height, types, rows.color_ids, parser.page_height
+
+
+def random_rows(seed: int):
+    random = np.random.default_rng(seed)
+    count = int(random.integers(0, 40))
+    # a coarse grid makes rows share a y now and then
+    y = random.integers(0, 200, count) * 10.0
+    x = random.choice([0.0, 10.0, 50.0], count)
+    height = random.choice([10.0, 20.0, 50.0, 400.0, 900.0], count)
+    types = random.choice([HEAD_TEXT, COLORED_BLOCK], count)
+    colors = random.integers(-1, 3, count).astype(np.int32)
+    return y, x, height, types, colors, 2000.0 + float(random.integers(0, 100))
+
+
+def full_segmentation(y, x, height, types, colors, page_height):
+    order = select_semantic_rows(y)
+    return segment_blocks(y[order], x[order], height[order], types[order], colors[order], page_height, MIN_BLOCK_HEIGHT)
+
+
+def chunked_segmentation(y, x, height, types, colors, page_height, chunk: int):
+    order = select_semantic_rows(y)
+    rows = list(zip(y[order].tolist(), x[order].tolist(), height[order].tolist(), types[order].tolist(),
+                    colors[order].tolist()))
+    expected = full_segmentation(y, x, height, types, colors, page_height)
+    segmenter = Segmenter(MIN_BLOCK_HEIGHT)
+    blocks = []
+    for start in range(0, len(rows), chunk):
+        for row in rows[start:start + chunk]:
+            blocks += segmenter.push(*row)
+        # what a chunk emits is final, later rows never change it
+        assert blocks == expected[:len(blocks)]
+    return blocks + segmenter.finish(page_height)
+
+
+def windowed_segmentation(y, x, height, types, colors, page_height, window_height: float):
+    # what StreamingParser.feed_semantic() does: rows arrive window by window and
+    # shared ys are dropped among the rows above the window bottom
+    segmenter = Segmenter(MIN_BLOCK_HEIGHT)
+    blocks = []
+    top = 0.0
+    while True:
+        bottom = top + window_height
+        last = bottom >= page_height
+        ready = np.flatnonzero((y >= top) & (y < bottom)) if not last else np.flatnonzero(y >= top)
+        for i in ready[select_semantic_rows(y[ready])]:
+            blocks += segmenter.push(y[i], x[i], height[i], types[i], colors[i])
+        if last:
+            return blocks + segmenter.finish(page_height)
+        top = bottom
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+@pytest.mark.parametrize("chunk", [1, 2, 3, 7, 1000])
+def test_chunked_push_matches_segment_blocks(name, chunk):
+    rows = semantic_rows(name)
+    assert chunked_segmentation(*rows, chunk) == full_segmentation(*rows)
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+@pytest.mark.parametrize("window_height", VIEWPORT_HEIGHTS)
+def test_windowed_push_matches_segment_blocks(name, window_height):
+    rows = semantic_rows(name)
+    assert windowed_segmentation(*rows, window_height) == full_segmentation(*rows)
+
+
+def test_random_layouts():
+    for seed in range(300):
+        rows = random_rows(seed)
+        expected = full_segmentation(*rows)
+        for chunk in (1, 4):
+            assert chunked_segmentation(*rows, chunk) == expected, seed
+        for window_height in (95, 500):
+            assert windowed_segmentation(*rows, window_height) == expected, seed
+
+
+def test_finish_without_rows():
+    assert Segmenter(MIN_BLOCK_HEIGHT).finish(1000) == []
+    assert segment_blocks(*(np.empty(0),) * 5, 1000, MIN_BLOCK_HEIGHT) == []
+
+
+class WindowedSnapshotDriver:
+    # answers the streaming page scripts from a snapshot like the page does: every pass returns
+    # the elements and texts above window_bottom that an earlier pass has not returned
+    def __init__(self, snapshot: PageSnapshot, viewport_height: float):
+        self.snapshot = snapshot
+        self.viewport_height = viewport_height
+        # one seen set per script, as the page keeps one per script
+        self.seen = {EXTRACT_ELEMENTS_SCRIPT: set(), COLLECT_TEXT_SCRIPT: set()}
+
+    def execute_script(self, script: str, *args):
+        snapshot = self.snapshot
+        if script == SCROLL_WINDOW_SCRIPT:
+            return {"scroll_y": min(args[0], max(0, snapshot.page_height - self.viewport_height)),
+                    "viewport_height": self.viewport_height,
+                    "page_width": snapshot.page_width, "page_height": snapshot.page_height}
+        window = args[0]
+        if window.get("reset_seen"):
+            self.seen[script] = set()
+        seen = self.seen[script]
+        if script == EXTRACT_ELEMENTS_SCRIPT:
+            elements = snapshot.elements
+            columns = {column: [] for column in elements}
+            for i, type in enumerate(elements["type"]):
+                if i in seen or elements["y"][i] >= window["window_bottom"]:
+                    continue
+                if type == "colored_block" and (elements["height"][i] < window["min_block_height"]
+                                                or elements["width"][i] < window["min_block_width"]):
+                    continue
+                seen.add(i)
+                for column in columns:
+                    columns[column].append(elements[column][i])
+            return {"columns": columns, "timings": {}}
+        if script == COLLECT_TEXT_SCRIPT:
+            texts = {}
+            for kind in ("words", "fonts"):
+                texts[kind] = [row for i, row in enumerate(snapshot.texts[kind])
+                               if (kind, i) not in seen and row[0] < window["window_bottom"]]
+                seen.update((kind, i) for i, row in enumerate(snapshot.texts[kind])
+                                 if row[0] < window["window_bottom"])
+            return texts
+        raise ValueError("unexpected script")
+
+
+class ReplayStreamingParser(StreamingParser):
+    def __init__(self, viewport_height: float, **kwargs):
+        self.viewport_height = viewport_height
+        super().__init__(scroll_pause=0, **kwargs)
+
+    def create_driver(self, firefox_path: str) -> None:
+        return None
+
+    def close(self) -> None:
+        self.screenshots.close()
+
+    def load_page(self, url: str) -> None:
+        self.driver = WindowedSnapshotDriver(PageSnapshot.load(url), self.viewport_height)
+
+    def collect_window(self, window_bottom: float, reset: bool) -> None:
+        # head texts are chosen against the largest font seen so far, a documented difference
+        # to the full parse. Starting from the page maximum leaves the windowing to compare
+        elements = self.driver.snapshot.elements
+        self.max_head_font_size = max(self.parse_font_size(size)
+                                      for type, size in zip(elements["type"], elements["font_size"])
+                                      if type == "head_text")
+        super().collect_window(window_bottom, reset)
+
+
+def normalized(df: pd.DataFrame) -> pd.DataFrame:
+    # concatenated window frames may hold a missing color as NaN instead of None
+    df = df.reset_index(drop=True)
+    colors = df["background_color"].astype(object)
+    return df.assign(background_color=colors.where(colors.notna(), None))
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+@pytest.mark.parametrize("viewport_height", VIEWPORT_HEIGHTS)
+def test_streaming_parse_matches_full_parse(name, viewport_height):
+    full = SnapshotParser(min_block_height=MIN_BLOCK_HEIGHT)
+    streaming = ReplayStreamingParser(viewport_height, min_block_height=MIN_BLOCK_HEIGHT)
+    try:
+        expected = full.parse(snapshot_path(name))
+        df = streaming.parse(snapshot_path(name))
+    finally:
+        full.close()
+        streaming.close()
+    pd.testing.assert_frame_equal(normalized(df), normalized(expected), check_dtype=False)
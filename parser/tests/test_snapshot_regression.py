@@ -0,0 +1,141 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from element_table import ELEMENT_TYPES
+from elements_index import ElementsIndex
+from result_cache import ResultCache
+from snapshot import PageSnapshot, SnapshotParser
+
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures")
+# block rows of the pre-ElementTable pandas parser for every snapshot in fixtures/
+with open(os.path.join(fixtures_dir, "baseline.json"), encoding="utf-8") as file:
+    BASELINE = json.load(file)
+SNAPSHOTS = sorted(BASELINE)
+
+
+@pytest.fixture
+def parser():
+    parser = SnapshotParser()
+    yield parser
+    parser.close()
+
+
+def snapshot_path(name: str) -> str:
+    return os.path.join(fixtures_dir, f"{name}.zip")
+
+
+def baseline(name: str) -> pd.DataFrame:
+    return pd.DataFrame(BASELINE[name], columns=list(BASELINE[name][0]))
+
+
+def collect(parser: SnapshotParser, name: str):
+    parser.load_page(snapshot_path(name))
+    parser.page_width = parser.get_page_width()
+    parser.page_height = parser.get_page_height()
+    parser.min_block_width = parser.min_block_width_ratio * parser.page_width
+    return parser.collect_elements_data(), parser.build_text_table(parser.collect_text_data())
+
+
+def between(frame: pd.DataFrame, type: str, y_begin: float, y_end: float) -> pd.DataFrame:
+    return frame.loc[(frame["type"] == type) & frame["y"].between(y_begin, y_end)]
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+def test_parse_matches_baseline(parser, name):
+    expected = baseline(name)
+    df = parser.parse(snapshot_path(name))
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_parse_snapshot_object(parser):
+    snapshot = PageSnapshot.load(snapshot_path("landing"))
+    df = parser.parse(snapshot)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), baseline("landing"), check_dtype=False)
+    assert parser.metrics.url == snapshot.url
+    # a later path argument is loaded from disk again
+    parser.parse(snapshot_path("generated_1"))
+    assert parser.snapshot.url != snapshot.url
+
+
+def test_parse_snapshot_object_cached(tmp_path):
+    snapshot = PageSnapshot.load(snapshot_path("landing"))
+    parser = SnapshotParser(cache=ResultCache(str(tmp_path)))
+    try:
+        first = parser.parse(snapshot)
+        second = parser.parse(snapshot)
+    finally:
+        parser.close()
+    # the second parse is served from the entry the first one stored under the page url
+    assert "cache_lookup" in parser.metrics.stages and "cache_store" not in parser.metrics.stages
+    assert parser.cache.invalidate(url=snapshot.url) == 1
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(first.reset_index(drop=True), baseline("landing"), check_dtype=False)
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+def test_segment_blocks(parser, name):
+    elements_data, _ = collect(parser, name)
+    blocks = parser.segment(elements_data)
+    assert [(x0, y0, x1 - x0, y1 - y0, color) for x0, y0, x1, y1, color in blocks] == [
+        (row["x"], row["y"], row["width"], row["height"], row["background_color"]) for row in BASELINE[name]]
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+def test_elements_index(parser, name):
+    expected = baseline(name)
+    elements_data, _ = collect(parser, name)
+    index = ElementsIndex(elements_data)
+    frame = elements_data.to_frame()
+    y_begin = expected["y"].to_numpy(dtype=float)
+    y_end = y_begin + expected["height"].to_numpy(dtype=float)
+
+    for type in ELEMENT_TYPES:
+        counts = [between(frame, type, begin, end).shape[0] for begin, end in zip(y_begin, y_end)]
+        assert index.count(type, y_begin, y_end).tolist() == counts
+        assert index.contains(type, y_begin, y_end).tolist() == [count > 0 for count in counts]
+        assert [index.count(type, begin, end) for begin, end in zip(y_begin, y_end)] == counts
+
+    different = [between(frame, "button", begin, end).groupby("text").first().shape[0]
+                 for begin, end in zip(y_begin, y_end)]
+    assert index.distinct_texts("button", y_begin, y_end).tolist() == different
+    assert different == expected["different_buttons_number"].tolist()
+    assert index.count("image", y_begin, y_end).tolist() == expected["images_number"].tolist()
+    assert index.count("button", y_begin, y_end).tolist() == expected["buttons_number"].tolist()
+    assert index.count("link", y_begin, y_end).tolist() == expected["links_number"].tolist()
+    assert index.contains("map", y_begin, y_end).tolist() == expected["contains_map"].tolist()
+    assert index.contains("form", y_begin, y_end).tolist() == expected["contains_forms"].tolist()
+    assert index.contains("slider", y_begin, y_end).tolist() == expected["contains_slider"].tolist()
+
+
+@pytest.mark.parametrize("name", SNAPSHOTS)
+def test_text_table(parser, name):
+    expected = baseline(name)
+    _, text_table = collect(parser, name)
+    texts = PageSnapshot.load(snapshot_path(name)).texts
+    y_begin = expected["y"].to_numpy(dtype=float)
+    y_end = y_begin + expected["height"].to_numpy(dtype=float)
+
+    words = [sum(count for y, count in texts["words"] if begin <= y <= end) for begin, end in zip(y_begin, y_end)]
+    fonts = [max([parser.parse_font_size(size) for y, size in texts["fonts"] if begin <= y <= end] + [0])
+             for begin, end in zip(y_begin, y_end)]
+    assert text_table.words_number(y_begin, y_end).tolist() == words == expected["words_number"].tolist()
+    assert text_table.max_font_size(y_begin, y_end).tolist() == fonts == expected["max_font_size"].tolist()
+    assert [text_table.max_font_size(begin, end) for begin, end in zip(y_begin, y_end)] == fonts
+
+
+def test_text_table_arbitrary_ranges(parser):
+    _, text_table = collect(parser, "landing")
+    texts = PageSnapshot.load(snapshot_path("landing")).texts
+    y_begin = np.arange(-100, 3100, 70, dtype=float)
+    for length in (0, 25, 130, 900, 5000):
+        y_end = y_begin + length
+        words = [sum(count for y, count in texts["words"] if begin <= y <= end) for begin, end in zip(y_begin, y_end)]
+        fonts = [max([parser.parse_font_size(size) for y, size in texts["fonts"] if begin <= y <= end] + [0])
+                 for begin, end in zip(y_begin, y_end)]
+        assert text_table.words_number(y_begin, y_end).tolist() == words
+        assert text_table.max_font_size(y_begin, y_end).tolist() == fonts
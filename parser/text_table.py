@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class TextTable:
+    def __init__(self, words_y, words_count, fonts_y, font_sizes):
+        words_y = np.asarray(words_y, dtype=float)
+        order = np.argsort(words_y, kind="stable")
+        self.words_y = words_y[order]
+        self.words_prefix = np.concatenate(
+            ([0], np.cumsum(np.asarray(words_count, dtype=np.int64)[order])))
+
+        fonts_y = np.asarray(fonts_y, dtype=float)
+        order = np.argsort(fonts_y, kind="stable")
+        self.fonts_y = fonts_y[order]
+        # sparse table: fonts_max[k][i] is the max over fonts[i:i + 2 ** k]
+        self.fonts_max = [np.asarray(font_sizes, dtype=np.int64)[order]]
+        k = 1
+        while (1 << k) <= self.fonts_y.shape[0]:
+            prev = self.fonts_max[-1]
+            half = 1 << (k - 1)
+            self.fonts_max.append(np.maximum(prev[:-half], prev[half:]))
+            k += 1
+
+    def words_number(self, y_min, y_max):
+        lo = np.searchsorted(self.words_y, y_min, side="left")
+        hi = np.maximum(np.searchsorted(self.words_y, y_max, side="right"), lo)
+        result = self.words_prefix[hi] - self.words_prefix[lo]
+        return result if np.ndim(y_min) else int(result)
+
+    def max_font_size(self, y_min, y_max):
+        lo = np.atleast_1d(np.searchsorted(self.fonts_y, y_min, side="left"))
+        hi = np.atleast_1d(np.searchsorted(self.fonts_y, y_max, side="right"))
+        result = np.zeros(lo.shape[0], dtype=np.int64)
+        non_empty = hi > lo
+        lengths = hi[non_empty] - lo[non_empty]
+        levels = np.floor(np.log2(lengths)).astype(int) if lengths.size else lengths
+        values = np.zeros(lengths.shape[0], dtype=np.int64)
+        for k in np.unique(levels):
+            at = levels == k
+            starts = lo[non_empty][at]
+            ends = hi[non_empty][at] - (1 << k)
+            values[at] = np.maximum(self.fonts_max[k][starts], self.fonts_max[k][ends])
+        result[non_empty] = values
+        return result if np.ndim(y_min) else int(result[0])